@@ -1,89 +1,109 @@
+import os
+import time
+import threading
 from datetime import datetime, timedelta
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import Task, Meeting, User
+from sqlalchemy import func, case, and_, select, literal, union_all
+from database import Task, Meeting, User, TaskDailyRollup, rollup_enabled
+from data_versions import data_versions
+
+BRIEFING_CACHE_SECONDS = int(os.getenv("BRIEFING_CACHE_SECONDS", "60"))
+SAMPLE_SIZE = 3
+HIGH_PRIORITY_LIMIT = 5
+
+_briefing_cache = {"key": None, "expires": 0.0, "value": None}
+_briefing_lock = threading.Lock()
+
+
+def _count_if(*conditions):
+    return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
 
 def get_daily_briefing(db: Session):
+    # Reused until a task write commits, the day rolls over, or the TTL lapses (SLA counts depend on the clock)
     today = datetime.utcnow().date()
-    
-    # Tasks completed today
-    completed_today = db.query(Task).filter(
-        Task.status == "Done",
-        func.date(Task.last_updated) == today
-    ).count()
-    
-    # Blocked tasks
-    blocked = db.query(Task).filter(Task.is_blocked == True, Task.status != "Done").all()
-    
-    # Risk tasks
-    risks = db.query(Task).filter(Task.is_potential_risk == True, Task.status != "Done").all()
-    
-    # High priority pending
-    high_priority = db.query(Task).filter(
-        Task.priority >= 8,
-        Task.status != "Done",
-        Task.is_approved == True
-    ).order_by(Task.priority.desc()).limit(5).all()
-    
-    # Overdue tasks
-    overdue = db.query(Task).filter(
-        Task.due_date < today.isoformat(),
-        Task.status != "Done"
-    ).all()
-    
-    # Manager approval pending
-    pending_approval = db.query(Task).filter(Task.status == "Manager Approval Pending").count()
-    
-    # SLA breached
-    sla_breached = db.query(Task).filter(
-        Task.status == "Submitted",
-        Task.verification_deadline_at < datetime.utcnow(),
-        Task.verified_at == None
-    ).count()
-    
+    key = (today, data_versions.version("tasks"))
+    with _briefing_lock:
+        if _briefing_cache["key"] == key and _briefing_cache["expires"] > time.monotonic():
+            return _briefing_cache["value"]
+    briefing = compute_daily_briefing(db, today)
+    with _briefing_lock:
+        _briefing_cache.update(key=key, expires=time.monotonic() + BRIEFING_CACHE_SECONDS, value=briefing)
+    return briefing
+
+
+def compute_daily_briefing(db: Session, today):
+    now = datetime.utcnow()
+    not_done = Task.status != "Done"
+    blocked = and_(Task.is_blocked == True, not_done)
+    risky = and_(Task.is_potential_risk == True, not_done)
+    overdue = and_(Task.due_date < today.isoformat(), not_done)
+    high_priority = and_(Task.priority >= 8, not_done, Task.is_approved == True)
+
+    # All counters in a single scan
+    counts = db.query(
+        _count_if(Task.status == "Done", func.date(Task.last_updated) == today.isoformat()).label("completed_today"),
+        _count_if(blocked).label("blocked"),
+        _count_if(risky).label("risks"),
+        _count_if(overdue).label("overdue"),
+        _count_if(Task.status == "Manager Approval Pending").label("pending_approval"),
+        _count_if(Task.status == "Submitted", Task.verification_deadline_at < now, Task.verified_at == None).label("sla_breached"),
+    ).one()
+
+    # Every sample list in one round trip, each capped by its own LIMIT
+    def sample(kind, condition, order_by, limit=SAMPLE_SIZE):
+        return select(
+            literal(kind).label("kind"), Task.id, Task.description, Task.blocker_reason,
+            Task.risk_reason, Task.priority, Task.due_date,
+        ).where(condition).order_by(*order_by).limit(limit).subquery()
+
+    parts = [
+        sample("blocked", blocked, [Task.id]),
+        sample("risk", risky, [Task.id]),
+        sample("overdue", overdue, [Task.id]),
+        sample("high_priority", high_priority, [Task.priority.desc(), Task.id], HIGH_PRIORITY_LIMIT),
+    ]
+    samples = {"blocked": [], "risk": [], "overdue": [], "high_priority": []}
+    for row in db.execute(union_all(*[select(part) for part in parts])):
+        samples[row.kind].append(row)
+
     return {
         "date": today.isoformat(),
-        "completed_today": completed_today,
-        "blocked_count": len(blocked),
-        "blocked_tasks": [{"id": t.id, "description": t.description, "reason": t.blocker_reason} for t in blocked[:3]],
-        "risk_count": len(risks),
-        "risk_tasks": [{"id": t.id, "description": t.description, "reason": t.risk_reason} for t in risks[:3]],
-        "high_priority": [{"id": t.id, "description": t.description, "priority": t.priority, "due_date": t.due_date} for t in high_priority],
-        "overdue_count": len(overdue),
-        "overdue_tasks": [{"id": t.id, "description": t.description, "due_date": t.due_date} for t in overdue[:3]],
-        "pending_approval": pending_approval,
-        "sla_breached": sla_breached
+        "completed_today": counts.completed_today,
+        "blocked_count": counts.blocked,
+        "blocked_tasks": [{"id": t.id, "description": t.description, "reason": t.blocker_reason} for t in samples["blocked"]],
+        "risk_count": counts.risks,
+        "risk_tasks": [{"id": t.id, "description": t.description, "reason": t.risk_reason} for t in samples["risk"]],
+        "high_priority": [{"id": t.id, "description": t.description, "priority": t.priority, "due_date": t.due_date} for t in samples["high_priority"]],
+        "overdue_count": counts.overdue,
+        "overdue_tasks": [{"id": t.id, "description": t.description, "due_date": t.due_date} for t in samples["overdue"]],
+        "pending_approval": counts.pending_approval,
+        "sla_breached": counts.sla_breached
     }
 
-def get_productivity_analytics(db: Session, days=7):
+def get_productivity_analytics(db: Session, days=7, team_id: Optional[int] = None, assignee_id: Optional[int] = None):
     start_date = datetime.utcnow() - timedelta(days=days)
     
     # Meeting time
     meetings = db.query(Meeting).filter(Meeting.created_at >= start_date).count()
     
-    # Task completion rate
-    total_tasks = db.query(Task).filter(Task.created_at >= start_date).count()
-    completed_tasks = db.query(Task).filter(
-        Task.created_at >= start_date,
-        Task.status == "Done"
-    ).count()
-    
-    # Average time to complete
-    completed = db.query(Task).filter(
-        Task.status == "Done",
-        Task.created_at >= start_date
-    ).all()
-    
-    avg_completion_time = 0
-    if completed:
-        times = [(t.last_updated - t.created_at).total_seconds() / 3600 for t in completed]
-        avg_completion_time = sum(times) / len(times)
-    
-    # Blocker frequency
-    blocked_count = db.query(Task).filter(
-        Task.is_blocked == True,
-        Task.created_at >= start_date
-    ).count()
+    if rollup_enabled():
+        # At most days x teams x assignees pre-aggregated rows instead of a task scan
+        query = db.query(
+            func.coalesce(func.sum(TaskDailyRollup.created), 0),
+            func.coalesce(func.sum(TaskDailyRollup.completed), 0),
+            func.coalesce(func.sum(TaskDailyRollup.blocked), 0),
+            func.coalesce(func.sum(TaskDailyRollup.completion_hours), 0.0),
+        ).filter(TaskDailyRollup.day >= start_date.date().isoformat())
+        if team_id is not None:
+            query = query.filter(TaskDailyRollup.team_id == team_id)
+        if assignee_id is not None:
+            query = query.filter(TaskDailyRollup.assignee_id == assignee_id)
+        total_tasks, completed_tasks, blocked_count, completion_hours = query.one()
+        avg_completion_time = completion_hours / completed_tasks if completed_tasks else 0
+    else:
+        total_tasks, completed_tasks, blocked_count, avg_completion_time = _scan_task_productivity(db, start_date, team_id, assignee_id)
     
     return {
         "period_days": days,
@@ -96,6 +116,30 @@ def get_productivity_analytics(db: Session, days=7):
         "blocker_rate": round((blocked_count / total_tasks * 100) if total_tasks > 0 else 0, 1)
     }
 
+def _scan_task_productivity(db: Session, start_date: datetime, team_id: Optional[int], assignee_id: Optional[int]):
+    # Fallback for databases without the rollup triggers
+    tasks = db.query(Task).filter(Task.created_at >= start_date)
+    if team_id is not None:
+        tasks = tasks.filter(Task.team_id == (team_id or None))
+    if assignee_id is not None:
+        tasks = tasks.filter(Task.assignee_id == assignee_id)
+    
+    # Task completion rate
+    total_tasks = tasks.count()
+    completed_tasks = tasks.filter(Task.status == "Done").count()
+    
+    # Average time to complete
+    completed = tasks.filter(Task.status == "Done").all()
+    
+    avg_completion_time = 0
+    if completed:
+        times = [(t.last_updated - t.created_at).total_seconds() / 3600 for t in completed]
+        avg_completion_time = sum(times) / len(times)
+    
+    # Blocker frequency
+    blocked_count = tasks.filter(Task.is_blocked == True).count()
+    return total_tasks, completed_tasks, blocked_count, avg_completion_time
+
 def detect_blockers_from_transcript(transcript: str):
     blocker_keywords = ["blocked", "stuck", "waiting", "can't proceed", "dependency", "issue", "problem", "blocker"]
     lines = transcript.lower().split('\n')
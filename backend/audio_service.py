@@ -0,0 +1,211 @@
+import os
+import time
+import hashlib
+import importlib
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, AudioBlob, Meeting
+from scheduler import scheduler
+
+AUDIO_UPLOAD_DIR = os.getenv("AUDIO_UPLOAD_DIR", "./uploads")
+AUDIO_MAX_UPLOAD_MB = float(os.getenv("AUDIO_MAX_UPLOAD_MB", "200"))
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "stub")
+# Modules imported at load so they can register_backend() before TRANSCRIPTION_BACKEND is checked
+TRANSCRIPTION_BACKEND_MODULES = [m.strip() for m in os.getenv("TRANSCRIPTION_BACKEND_MODULES", "").split(",") if m.strip()]
+AUDIO_CHUNK_BYTES = 1024 * 1024
+# Recordings are deleted this long after upload even if their meeting still exists; 0 keeps them while referenced
+AUDIO_RETENTION_DAYS = float(os.getenv("AUDIO_RETENTION_DAYS", "30"))
+AUDIO_CLEANUP_INTERVAL_SECONDS = int(os.getenv("AUDIO_CLEANUP_INTERVAL_SECONDS", "3600"))
+# Blobs touched this recently are left alone: their upload may not have reached the audio_blobs table yet
+AUDIO_ORPHAN_GRACE = timedelta(hours=1)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class StoredAudio:
+    def __init__(self, sha256: str, path: str, size: int, filename: str, deduplicated: bool):
+        self.sha256 = sha256
+        self.path = path
+        self.size = size
+        self.filename = filename
+        self.deduplicated = deduplicated
+
+
+class AudioStore:
+    """Content-addressed blob directory for uploaded recordings.
+
+    Uploads are copied in fixed-size chunks and hashed on the way through, so memory use does not grow with
+    the recording; a file whose digest is already stored is dropped and the existing blob reused.
+    """
+
+    def __init__(self, root: str = AUDIO_UPLOAD_DIR, max_bytes: int = int(AUDIO_MAX_UPLOAD_MB * 1024 * 1024)):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def save(self, source: BinaryIO, filename: Optional[str] = None) -> StoredAudio:
+        # Blocking file I/O: call from a worker thread
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, partial = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = source.read(AUDIO_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"Audio upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+                    digest.update(chunk)
+                    out.write(chunk)
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256)
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                os.unlink(partial)
+                # Fresh mtime keeps the cleanup job off a blob that is about to be referenced again
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.unlink(partial)
+            raise
+        return StoredAudio(sha256, path, size, filename or sha256, deduplicated)
+
+    def blobs(self) -> Iterator[Tuple[str, float]]:
+        # (sha256, mtime) of every stored recording
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.scandir(self.root):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.is_file() and "." not in entry.name:
+                    yield entry.name, entry.stat().st_mtime
+
+    def delete(self, sha256: str) -> None:
+        # The recording and every transcript cached beside it
+        path = self.path_for(sha256)
+        directory = os.path.dirname(path)
+        for name in os.listdir(directory):
+            if name == sha256 or name.startswith(sha256 + "."):
+                try:
+                    os.unlink(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+        try:
+            os.rmdir(directory)
+        except OSError:
+            # Still holds other recordings, or a concurrent upload just recreated it
+            pass
+
+    def purge_partials(self, older_than: float) -> int:
+        # .part files left behind by a process that died mid-upload
+        removed = 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if name.endswith(".part") and os.path.getmtime(path) < older_than:
+                    os.unlink(path)
+                    removed += 1
+        return removed
+
+
+class TranscriptionBackend(ABC):
+    """Turns a stored recording into transcript text. Subclass it and register_backend() an instance to plug in an engine."""
+
+    name = "base"
+    # Transcripts are keyed by audio digest and backend, so re-uploading a recording skips transcription
+    cache_results = True
+
+    @abstractmethod
+    def transcribe(self, path: str, filename: str) -> str:
+        ...
+
+
+class StubTranscriber(TranscriptionBackend):
+    """Local placeholder used until a real engine is configured; never reads the audio."""
+
+    name = "stub"
+    cache_results = False
+
+    def transcribe(self, path: str, filename: str) -> str:
+        return f"[Audio uploaded: {filename} — transcription not enabled]"
+
+
+TRANSCRIPTION_BACKENDS: Dict[str, TranscriptionBackend] = {}
+
+
+def register_backend(backend: TranscriptionBackend) -> None:
+    TRANSCRIPTION_BACKENDS[backend.name] = backend
+
+
+register_backend(StubTranscriber())
+for module in TRANSCRIPTION_BACKEND_MODULES:
+    importlib.import_module(module)
+if TRANSCRIPTION_BACKEND not in TRANSCRIPTION_BACKENDS:
+    raise ValueError(f"Unknown TRANSCRIPTION_BACKEND {TRANSCRIPTION_BACKEND!r}, expected one of {sorted(TRANSCRIPTION_BACKENDS)}")
+
+
+def transcribe_audio(sha256: str, filename: str, backend_name: Optional[str] = None) -> str:
+    backend = TRANSCRIPTION_BACKENDS[backend_name or TRANSCRIPTION_BACKEND]
+    path = audio_store.path_for(sha256)
+    cached = f"{path}.{backend.name}.txt"
+    if backend.cache_results and os.path.exists(cached):
+        with open(cached, encoding="utf-8") as f:
+            return f.read()
+    text = backend.transcribe(path, filename)
+    if backend.cache_results:
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(partial, cached)
+    return text
+
+
+audio_store = AudioStore()
+
+
+def record_audio(db: Session, audio: dict, meeting_id: int, uploaded_by_id: Optional[int]) -> None:
+    # Added to the caller's transaction, so the reference lands with the meeting it belongs to
+    db.add(AudioBlob(sha256=audio["sha256"], filename=audio["filename"], meeting_id=meeting_id, uploaded_by_id=uploaded_by_id))
+
+
+def collect_audio_garbage(db: Session, now: Optional[datetime] = None) -> int:
+    """Drop expired and orphaned audio_blobs rows, then delete stored recordings no remaining row uses."""
+    now = now or datetime.utcnow()
+    if AUDIO_RETENTION_DAYS > 0:
+        db.query(AudioBlob).filter(AudioBlob.created_at < now - timedelta(days=AUDIO_RETENTION_DAYS)).delete(synchronize_session=False)
+    meeting_gone = ~exists().where(Meeting.id == AudioBlob.meeting_id)
+    db.query(AudioBlob).filter(meeting_gone).delete(synchronize_session=False)
+    db.commit()
+
+    live = {sha256 for (sha256,) in db.query(AudioBlob.sha256).distinct()}
+    settled = time.time() - AUDIO_ORPHAN_GRACE.total_seconds()
+    removed = 0
+    for sha256, modified in list(audio_store.blobs()):
+        if sha256 not in live and modified < settled:
+            audio_store.delete(sha256)
+            removed += 1
+    audio_store.purge_partials(settled)
+    return removed
+
+
+@scheduler.every(AUDIO_CLEANUP_INTERVAL_SECONDS, "collect_audio_garbage")
+def _collect_audio_garbage_job() -> None:
+    with SessionLocal() as db:
+        collect_audio_garbage(db)
@@ -0,0 +1,368 @@
+import os
+import json
+import hmac
+import base64
+import hashlib
+import secrets
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Dict
+
+from sqlalchemy import event, inspect, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, User, Token, StreamTicket, RevokedToken, TokenCutoff, create_token_for_user
+from scheduler import scheduler
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+# "opaque" stores a random token per login; "signed" issues HMAC tokens verified without the DB
+AUTH_TOKEN_MODE = os.getenv("AUTH_TOKEN_MODE", "opaque").lower()
+AUTH_TOKEN_DAYS = int(os.getenv("AUTH_TOKEN_DAYS", "7"))
+TOKEN_PURGE_INTERVAL_SECONDS = int(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+SIGNED_TOKEN_PREFIX = "s1."
+STREAM_TICKET_SECONDS = int(os.getenv("STREAM_TICKET_SECONDS", "60"))
+# How often each process reads revocations made by other processes
+AUTH_REVOCATION_POLL_SECONDS = float(os.getenv("AUTH_REVOCATION_POLL_SECONDS", "1"))
+# Re-read window behind the last sync, so a revocation committed just after it was stamped is not missed
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=60)
+
+_secret = os.getenv("AUTH_TOKEN_SECRET")
+if not _secret and AUTH_TOKEN_MODE == "signed":
+    print("AUTH_TOKEN_SECRET not set - signed tokens will not survive a restart")
+AUTH_TOKEN_SECRET = (_secret or secrets.token_hex(32)).encode()
+
+
+class CachedToken(NamedTuple):
+    user_id: int
+    username: str
+    is_admin: bool
+    expires_at: datetime
+    cached_at: float
+    cached_until: datetime
+
+
+class TokenCache:
+    """Bounded LRU of bearer token -> user identity, capped by the token's own expiry."""
+
+    def __init__(self, maxsize: int = AUTH_CACHE_SIZE, ttl_seconds: int = AUTH_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries: "OrderedDict[str, CachedToken]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[CachedToken]:
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.cached_until <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, user_id: int, username: str, is_admin: bool, expires_at: datetime) -> None:
+        if self.maxsize <= 0:
+            return
+        now = datetime.utcnow()
+        cached_until = min(now + self.ttl, expires_at)
+        with self._lock:
+            self._entries[token] = CachedToken(user_id, username, is_admin, expires_at, now.timestamp(), cached_until)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [tok for tok, entry in self._entries.items() if entry.user_id == user_id]
+            for tok in stale:
+                del self._entries[tok]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl_seconds": int(self.ttl.total_seconds()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache()
+
+
+# Keep the cache honest when tokens or users change through the ORM
+@event.listens_for(Token, "after_delete")
+def _token_deleted(mapper, connection, target: Token) -> None:
+    token_cache.invalidate_token(target.token)
+
+
+@event.listens_for(Token, "after_update")
+def _token_updated(mapper, connection, target: Token) -> None:
+    token_cache.invalidate_token(target.token)
+
+
+# --- Signed session tokens ---
+
+
+class SignedClaims(NamedTuple):
+    user_id: int
+    username: str
+    is_admin: bool
+    issued_at: float
+    expires_at: int
+    jti: str
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(AUTH_TOKEN_SECRET, payload.encode(), hashlib.sha256).digest())
+
+
+def create_signed_token(user: User, days_valid: int = AUTH_TOKEN_DAYS) -> str:
+    now = datetime.utcnow().timestamp()
+    claims = {
+        "uid": user.id,
+        "usr": user.username,
+        "adm": bool(user.is_admin),
+        "iat": now,
+        "exp": int(now) + days_valid * 86400,
+        "jti": secrets.token_hex(8),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{SIGNED_TOKEN_PREFIX}{payload}.{_sign(payload)}"
+
+
+def is_signed_token(token: str) -> bool:
+    return token.startswith(SIGNED_TOKEN_PREFIX)
+
+
+class RevocationList:
+    """Cache of the revoked_tokens and token_cutoffs tables, which every process writes to and reads from.
+
+    Revocations made by this process apply at once; rows written by other processes are read in at most
+    every poll_seconds, which bounds how long a token revoked elsewhere keeps working here.
+    """
+
+    def __init__(self, poll_seconds: float = AUTH_REVOCATION_POLL_SECONDS, session_factory=SessionLocal):
+        self.poll_seconds = poll_seconds
+        self._session_factory = session_factory
+        self._jtis: Dict[str, float] = {}
+        self._not_before: Dict[int, float] = {}
+        self._read_at: Optional[float] = None
+        self._synced_to: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        now = datetime.utcnow().timestamp()
+        with self._lock:
+            self._jtis[jti] = expires_at
+            for key in [k for k, exp in self._jtis.items() if exp < now]:
+                del self._jtis[key]
+
+    def revoke_user(self, user_id: int, not_before: Optional[float] = None) -> None:
+        not_before = not_before or datetime.utcnow().timestamp()
+        with self._lock:
+            self._not_before[user_id] = max(not_before, self._not_before.get(user_id, 0.0))
+
+    def purge(self, max_age_seconds: int = AUTH_TOKEN_DAYS * 86400) -> int:
+        # A cut-off older than the longest token lifetime no longer rejects anything that has not already expired
+        now = datetime.utcnow().timestamp()
+        with self._lock:
+            expired_jtis = [k for k, exp in self._jtis.items() if exp < now]
+            old_cutoffs = [k for k, ts in self._not_before.items() if ts < now - max_age_seconds]
+            for key in expired_jtis:
+                del self._jtis[key]
+            for key in old_cutoffs:
+                del self._not_before[key]
+        return len(expired_jtis) + len(old_cutoffs)
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._read_at is not None and now - self._read_at < self.poll_seconds:
+                return
+            # Claimed before the read so concurrent requests keep using the cache instead of queueing on the DB
+            self._read_at = now
+            since = self._synced_to - REVOCATION_SYNC_OVERLAP if self._synced_to else None
+        started = datetime.utcnow()
+        with self._session_factory() as db:
+            jtis = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at >= started)
+            cutoffs = db.query(TokenCutoff.user_id, TokenCutoff.not_before)
+            if since is not None:
+                jtis = jtis.filter(RevokedToken.revoked_at >= since)
+                cutoffs = cutoffs.filter(TokenCutoff.not_before >= since.timestamp())
+            jtis, cutoffs = jtis.all(), cutoffs.all()
+        # Merged rather than replaced: revocations are never undone, and this process may have added some meanwhile
+        with self._lock:
+            for jti, expires_at in jtis:
+                self._jtis[jti] = expires_at.timestamp()
+            for user_id, not_before in cutoffs:
+                self._not_before[user_id] = max(not_before, self._not_before.get(user_id, 0.0))
+            self._synced_to = max(started, self._synced_to or started)
+
+    def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        self.refresh()
+        with self._lock:
+            if jti in self._jtis:
+                return True
+            not_before = self._not_before.get(user_id)
+        return not_before is not None and issued_at < not_before
+
+    def __len__(self) -> int:
+        return len(self._jtis)
+
+
+revocations = RevocationList()
+
+
+def _dialect_insert(connection: Connection, model):
+    return (postgresql if connection.dialect.name == "postgresql" else sqlite).insert(model)
+
+
+def store_revoked_token(connection: Connection, jti: str, expires_at: float) -> None:
+    stmt = _dialect_insert(connection, RevokedToken).values(
+        jti=jti, expires_at=datetime.fromtimestamp(expires_at), revoked_at=datetime.utcnow()
+    )
+    connection.execute(stmt.on_conflict_do_nothing(index_elements=["jti"]))
+    revocations.revoke(jti, expires_at)
+
+
+def store_token_cutoff(connection: Connection, user_id: int) -> None:
+    not_before = datetime.utcnow().timestamp()
+    stmt = _dialect_insert(connection, TokenCutoff).values(user_id=user_id, not_before=not_before)
+    connection.execute(stmt.on_conflict_do_update(index_elements=["user_id"], set_={"not_before": not_before}))
+    revocations.revoke_user(user_id, not_before)
+
+
+def opaque_token_id(token: str) -> str:
+    # Opaque tokens are recorded by hash so the revocation table never holds a usable credential
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def cached_token(token: str) -> Optional[CachedToken]:
+    entry = token_cache.get(token)
+    if entry and revocations.is_revoked(opaque_token_id(token), entry.user_id, entry.cached_at):
+        # Logged out or changed in another process since it was cached: fall back to the tokens table
+        token_cache.invalidate_token(token)
+        return None
+    return entry
+
+
+def verify_signed_token(token: str) -> Optional[SignedClaims]:
+    try:
+        payload, signature = token[len(SIGNED_TOKEN_PREFIX):].split(".", 1)
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        data = json.loads(_b64decode(payload))
+        claims = SignedClaims(data["uid"], data["usr"], data["adm"], data["iat"], data["exp"], data["jti"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if claims.expires_at < datetime.utcnow().timestamp() or revocations.is_revoked(claims.jti, claims.user_id, claims.issued_at):
+        return None
+    return claims
+
+
+def issue_token(db: Session, user: User) -> str:
+    if AUTH_TOKEN_MODE == "signed":
+        return create_signed_token(user)
+    return create_token_for_user(db, user, days_valid=AUTH_TOKEN_DAYS)
+
+
+def revoke_token(db: Session, token: str) -> None:
+    if is_signed_token(token):
+        claims = verify_signed_token(token)
+        if claims:
+            store_revoked_token(db.connection(), claims.jti, claims.expires_at)
+            db.commit()
+        return
+    tok = db.query(Token).filter(Token.token == token).first()
+    if tok:
+        # Other processes may still hold the token in their TokenCache
+        store_revoked_token(db.connection(), opaque_token_id(token), tok.expires_at.timestamp())
+        db.delete(tok)
+        db.commit()
+
+
+# Cached lookups and signed tokens both carry the admin flag, so a change must cut them off
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if state.attrs.is_admin.history.has_changes() or state.attrs.username.history.has_changes():
+        token_cache.invalidate_user(target.id)
+        store_token_cutoff(connection, target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    token_cache.invalidate_user(target.id)
+    store_token_cutoff(connection, target.id)
+
+
+def issue_stream_ticket(db: Session, user_id: int) -> str:
+    ticket = secrets.token_urlsafe(32)
+    db.add(StreamTicket(ticket=ticket, user_id=user_id, expires_at=datetime.utcnow() + timedelta(seconds=STREAM_TICKET_SECONDS)))
+    db.commit()
+    return ticket
+
+
+def redeem_stream_ticket(db: Session, ticket: str) -> Optional[int]:
+    # Deleted as it is read, so a ticket copied from a log or proxy can never be replayed
+    user_id = db.execute(
+        delete(StreamTicket)
+        .where(StreamTicket.ticket == ticket, StreamTicket.expires_at > datetime.utcnow())
+        .returning(StreamTicket.user_id)
+    ).scalar()
+    db.commit()
+    return user_id
+
+
+def purge_expired_tokens(db: Session) -> int:
+    deleted = db.query(Token).filter(Token.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    deleted += db.query(StreamTicket).filter(StreamTicket.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    deleted += db.query(RevokedToken).filter(RevokedToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    cutoff_expiry = (datetime.utcnow() - timedelta(days=AUTH_TOKEN_DAYS)).timestamp()
+    deleted += db.query(TokenCutoff).filter(TokenCutoff.not_before < cutoff_expiry).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+@scheduler.every(TOKEN_PURGE_INTERVAL_SECONDS, "purge_expired_tokens")
+def _purge_expired_tokens_job() -> None:
+    with SessionLocal() as db:
+        purge_expired_tokens(db)
+    revocations.purge()
@@ -0,0 +1,113 @@
+"""Mixed read/write load against each SQLite engine profile (see DB_PROFILE in database.py).
+
+Run from backend/:  python -m benchmarks.bench_db_concurrency --readers 16 --writers 4 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, User, Meeting, Task, ENGINE_PROFILES, make_engine
+
+
+def seed(Session, rows: int) -> None:
+    with Session() as db:
+        db.add(User(username="bench", password="x"))
+        db.add(Meeting(title="Bench", date="2030-01-01"))
+        db.flush()
+        db.bulk_insert_mappings(Task, [
+            {"description": f"Seed task {i}", "status": "To Do", "meeting_id": 1, "assignee_id": 1, "priority": i % 10}
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+def reader(Session, stop, stats, lock) -> None:
+    latencies, errors = [], 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with Session() as db:
+                db.query(Task.id, Task.description, Task.status).order_by(Task.created_at.desc(), Task.id.desc()).limit(100).all()
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    with lock:
+        stats["read"].extend(latencies)
+        stats["read_errors"] += errors
+
+
+def writer(Session, stop, stats, lock, seed_value) -> None:
+    rng = random.Random(seed_value)
+    latencies, errors = [], 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with Session() as db:
+                db.add(Task(description="Bench write", status="To Do", meeting_id=1, assignee_id=1, priority=rng.randint(1, 10)))
+                db.commit()
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    with lock:
+        stats["write"].extend(latencies)
+        stats["write_errors"] += errors
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run(path: str, profile: str, readers: int, writers: int, seconds: float, rows: int) -> dict:
+    engine = make_engine(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    seed(Session, rows)
+
+    stats = {"read": [], "write": [], "read_errors": 0, "write_errors": 0}
+    lock, stop = threading.Lock(), threading.Event()
+    threads = [threading.Thread(target=reader, args=(Session, stop, stats, lock)) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(Session, stop, stats, lock, i)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--profiles", nargs="+", default=list(ENGINE_PROFILES), choices=ENGINE_PROFILES)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s, {args.rows} seeded tasks")
+    print(f"{'profile':>8} {'reads/s':>9} {'read p95 ms':>12} {'writes/s':>9} {'write p95 ms':>13} {'errors':>7}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = run(os.path.join(tmp, f"{profile}.db"), profile, args.readers, args.writers, args.seconds, args.rows)
+        errors = stats["read_errors"] + stats["write_errors"]
+        print(
+            f"{profile:>8} {len(stats['read']) / args.seconds:>9.0f} {percentile(stats['read'], 0.95) * 1000:>12.1f}"
+            f" {len(stats['write']) / args.seconds:>9.0f} {percentile(stats['write'], 0.95) * 1000:>13.1f} {errors:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Latency, throughput and SQL statements per request across the real endpoint mix, with JSON output for diffing.
+
+Run from backend/:  python -m benchmarks.bench_endpoints --concurrency 8 --seconds 10 --json results.json
+
+By default the app runs in-process against a fresh synthetic database with the Gemini model stubbed out.
+To drive a local server instead, start it with the same stub and SQL counter, then pass --url:
+
+    DATABASE_URL=sqlite:///./scale.db uvicorn benchmarks.bench_endpoints:stub_app --factory --port 8000
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.bench_endpoints --url http://127.0.0.1:8000
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_MIX = "login=2,tasks=10,tasks_my=20,tasks_queue=10,briefing=10,notifications=20,task_update=10,meetings_process=2"
+SQL_HEADER = "X-SQL-Statements"
+
+_statements: ContextVar[Optional[List[int]]] = ContextVar("bench_statements", default=None)
+
+
+class StubModel:
+    """Stands in for the Gemini model: fixed latency, well-formed answers, assignees drawn from real users."""
+
+    def __init__(self, assignees: List[str], latency: float, seed: int = 0):
+        self.assignees = assignees
+        self.latency = latency
+        self.rng = random.Random(seed)
+
+    def generate_content(self, prompt: str):
+        time.sleep(self.latency)
+        if "extract action items" in prompt:
+            tasks = [
+                {"assignee": self.rng.choice(self.assignees), "description": f"Follow up on item {self.rng.randrange(10 ** 6)}",
+                 "due_date": None, "priority": self.rng.randint(1, 10), "effort_tag": "medium", "confidence": 0.9,
+                 "is_potential_risk": False, "risk_reason": None}
+                for _ in range(3)
+            ]
+            text = json.dumps(tasks)
+        else:
+            text = "Stub summary: the team reviewed progress and agreed on next steps."
+        return type("StubResponse", (), {"text": text})()
+
+
+def count_statements(app):
+    """Wrap an ASGI app so each HTTP response carries the number of SQL statements it ran.
+
+    Counting rides on a context variable, which starlette copies into the threadpool that runs sync endpoints.
+    """
+    import database
+    from sqlalchemy import event
+
+    @event.listens_for(database.engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+        counter = [0]
+        token = _statements.set(counter)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(SQL_HEADER.lower().encode(), str(counter[0]).encode())]
+            await send(message)
+
+        try:
+            await app(scope, receive, send_with_count)
+        finally:
+            _statements.reset(token)
+
+    return wrapped
+
+
+def install_stub_model(latency: float = 0.05) -> None:
+    import gemini_service
+    from database import SessionLocal, User
+
+    with SessionLocal() as db:
+        names = [row.username for row in db.query(User.username).filter(User.is_admin == False).limit(50)]
+    gemini_service.model = StubModel(names or ["unassigned"], latency)
+
+
+def stub_app():
+    # uvicorn --factory entry point: the real app with the stub model and SQL counter installed
+    os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+    import main
+    install_stub_model(float(os.getenv("BENCH_LLM_LATENCY_MS", "50")) / 1000)
+    return count_statements(main.app)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def load_fixtures(users: int) -> Dict:
+    # Plain-text demo passwords make it possible to log in as real users of any database
+    from database import SessionLocal, User, Task
+
+    with SessionLocal() as db:
+        admin = db.query(User.username, User.password).filter(User.is_admin == True).order_by(User.id).first()
+        members = db.query(User.id, User.username, User.password).filter(User.is_admin == False).order_by(User.id).limit(users).all()
+        task_ids = {
+            m.id: [row.id for row in db.query(Task.id).filter(Task.assignee_id == m.id).order_by(Task.id.desc()).limit(100)]
+            for m in members
+        }
+    if admin is None or not members:
+        raise SystemExit("The database needs at least one admin and one regular user")
+    return {"admin": (admin.username, admin.password), "members": [(m.username, m.password, task_ids[m.id]) for m in members]}
+
+
+def build_requests(fixtures: Dict, tokens: Dict[str, str]) -> Dict[str, Callable]:
+    admin_name = fixtures["admin"][0]
+
+    def auth(name):
+        return {"Authorization": f"Bearer {tokens[name]}"}
+
+    def login(client, rng, member):
+        name, password, _ = member
+        return client.post("/auth/login", json={"username": name, "password": password})
+
+    def tasks(client, rng, member):
+        return client.get("/tasks?limit=100", headers=auth(admin_name))
+
+    def tasks_my(client, rng, member):
+        return client.get("/tasks/my", headers=auth(member[0]))
+
+    def tasks_queue(client, rng, member):
+        return client.get("/tasks/queue", headers=auth(member[0]))
+
+    def briefing(client, rng, member):
+        return client.get("/analytics/briefing", headers=auth(member[0]))
+
+    def notifications(client, rng, member):
+        return client.get("/notifications", headers=auth(member[0]))
+
+    def task_update(client, rng, member):
+        name, _, task_ids = member
+        if not task_ids:
+            return client.get("/tasks/my", headers=auth(name))
+        return client.patch(f"/tasks/{rng.choice(task_ids)}", json={"priority": rng.randint(1, 10)}, headers=auth(name))
+
+    def meetings_process(client, rng, member):
+        transcript = "\n".join(f"{m[0]}: I will handle item {rng.randrange(10 ** 6)} by Friday." for m in rng.sample(fixtures["members"], 3))
+        return client.post("/meetings/process", data={"title": "Bench sync", "transcript": transcript, "bypass_cache": "true"}, headers=auth(admin_name))
+
+    return {
+        "login": login, "tasks": tasks, "tasks_my": tasks_my, "tasks_queue": tasks_queue, "briefing": briefing,
+        "notifications": notifications, "task_update": task_update, "meetings_process": meetings_process,
+    }
+
+
+def run_load(make_client: Callable, requests: Dict[str, Callable], mix: Dict[str, float], members: List, concurrency: int,
+             seconds: float, warmup: int, seed: int) -> Dict[str, List]:
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    samples: Dict[str, List] = {name: [] for name in names}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        client = make_client()
+        local = {name: [] for name in names}
+        for i in range(warmup):
+            requests[names[i % len(names)]](client, rng, rng.choice(members))
+        while not stop.is_set():
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            response = requests[name](client, rng, rng.choice(members))
+            elapsed = time.perf_counter() - started
+            sql = response.headers.get(SQL_HEADER)
+            local[name].append((elapsed, response.status_code, int(sql) if sql is not None else None))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(samples: List, seconds: float) -> Dict:
+    latencies = [s[0] for s in samples]
+    sql = [s[2] for s in samples if s[2] is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s[1] >= 400),
+        "throughput_rps": round(len(samples) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "sql_per_request": round(sum(sql) / len(sql), 2) if sql else None,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--warmup", type=int, default=20, help="Requests per worker before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. tasks_my=5,task_update=1")
+    parser.add_argument("--tasks", type=int, default=20000, help="Size of the generated database when DATABASE_URL is not set")
+    parser.add_argument("--users", type=int, default=50, help="Regular users the load is spread across")
+    parser.add_argument("--llm-latency-ms", type=float, default=50, help="Stubbed Gemini call latency")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    tmp = None
+    if "DATABASE_URL" not in os.environ:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+    os.environ.setdefault("JOB_WORKERS", "0")
+
+    from seed_data import parse_weights, seed_synthetic_data
+    if tmp is not None:
+        seed_synthetic_data(users=max(args.users * 4, 100), teams=10, meetings=max(args.tasks // 10, 1), tasks=args.tasks,
+                            notifications=args.tasks * 2, workcycles=26, days=365, seed=args.seed)
+    mix = parse_weights(args.mix)
+    fixtures = load_fixtures(args.users)
+
+    if args.url:
+        import httpx
+        make_client = lambda: httpx.Client(base_url=args.url, timeout=60)
+        context = None
+    else:
+        from fastapi.testclient import TestClient
+        import main as app_module
+        install_stub_model(args.llm_latency_ms / 1000)
+        client = TestClient(count_statements(app_module.app))
+        context = client.__enter__()
+        make_client = lambda: client
+
+    try:
+        tokens = {}
+        setup = make_client()
+        for name, password in [fixtures["admin"]] + [(m[0], m[1]) for m in fixtures["members"]]:
+            response = setup.post("/auth/login", json={"username": name, "password": password})
+            response.raise_for_status()
+            tokens[name] = response.json()["token"]
+        requests = build_requests(fixtures, tokens)
+        unknown = set(mix) - set(requests)
+        if unknown:
+            raise SystemExit(f"Unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+        samples = run_load(make_client, requests, mix, fixtures["members"], args.concurrency, args.seconds, args.warmup, args.seed)
+    finally:
+        if context is not None:
+            client.__exit__(None, None, None)
+
+    endpoints = {name: summarize(values, args.seconds) for name, values in samples.items()}
+    overall = summarize([s for values in samples.values() for s in values], args.seconds)
+    print(f"{args.concurrency} workers, {args.seconds:g}s, {'in-process' if not args.url else args.url}")
+    print(f"{'endpoint':>17} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL/req':>8}")
+    for name, row in [*endpoints.items(), ("all", overall)]:
+        sql = f"{row['sql_per_request']:.1f}" if row["sql_per_request"] is not None else "-"
+        print(f"{name:>17} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.1f}"
+              f" {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {sql:>8}")
+
+    if args.json:
+        result = {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "target": args.url or "in-process",
+            "config": {"concurrency": args.concurrency, "seconds": args.seconds, "mix": mix, "users": args.users,
+                       "tasks": args.tasks if tmp is not None else None, "llm_latency_ms": args.llm_latency_ms, "seed": args.seed},
+            "endpoints": endpoints,
+            "overall": overall,
+        }
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.json}")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
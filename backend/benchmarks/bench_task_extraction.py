@@ -0,0 +1,99 @@
+"""Cost of persisting extracted tasks: per-task commit loop vs one bulk transaction.
+
+Run from backend/:  python -m benchmarks.bench_task_extraction --items 10 100 1000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, User, Meeting, Task, get_or_create_user
+from task_service import DEFAULT_PASSWORD, find_user_by_username, calculate_suggested_focus_time, save_extracted_tasks
+
+KNOWN_USERS = ["Priya", "Arjun", "Raghav", "Admin"]
+
+
+def fake_extraction(items: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    names = KNOWN_USERS + ["priya", "ARJUN", "Meera", "Karan"]
+    return [
+        {
+            "assignee": rng.choice(names),
+            "description": f"Follow up on item {i}",
+            "due_date": "2030-01-15",
+            "priority": rng.randint(1, 10),
+            "effort_tag": rng.choice(["small", "medium", "large"]),
+            "confidence": rng.random(),
+            "is_potential_risk": False,
+            "risk_reason": None,
+        }
+        for i in range(items)
+    ]
+
+
+def legacy_save(db, ai_tasks, meeting_id):
+    # The pre-bulk implementation: lookups, commit and refresh for every task
+    for task_data in ai_tasks:
+        assignee_name = task_data.get("assignee", "unassigned")
+        assignee = find_user_by_username(db, assignee_name)
+        if not assignee:
+            assignee = get_or_create_user(db, assignee_name, DEFAULT_PASSWORD, False)
+        confidence = task_data.get("confidence", 1.0)
+        task = Task(
+            description=task_data["description"],
+            due_date=task_data.get("due_date"),
+            status="To Do",
+            meeting_id=meeting_id,
+            assignee_id=assignee.id,
+            priority=4 if confidence < 0.7 else task_data.get("priority", 5),
+            effort_tag=task_data.get("effort_tag"),
+            confidence=confidence,
+            needs_priority_review=confidence < 0.7,
+            suggested_focus_time=calculate_suggested_focus_time(task_data.get("due_date"), task_data.get("effort_tag")),
+        )
+        db.add(task)
+        db.commit()
+        db.refresh(task)
+
+
+def run(path: str, save, ai_tasks) -> tuple:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([User(username=name, password="x") for name in KNOWN_USERS])
+        db.add(Meeting(title="Bench", date="2030-01-01"))
+        db.commit()
+        meeting_id = db.query(Meeting.id).scalar()
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.__setitem__(0, statements[0] + 1))
+    with Session() as db:
+        start = time.perf_counter()
+        save(db, ai_tasks, meeting_id)
+        elapsed = time.perf_counter() - start
+        assert db.query(Task).count() == len(ai_tasks)
+    engine.dispose()
+    return elapsed, statements[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'legacy ms':>10} {'legacy stmts':>13} {'bulk ms':>9} {'bulk stmts':>11} {'speedup':>8}")
+    for items in args.items:
+        ai_tasks = fake_extraction(items)
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_time, legacy_stmts = run(os.path.join(tmp, "legacy.db"), legacy_save, ai_tasks)
+            bulk_time, bulk_stmts = run(os.path.join(tmp, "bulk.db"), save_extracted_tasks, ai_tasks)
+        print(f"{items:>6} {legacy_time * 1000:>10.1f} {legacy_stmts:>13} {bulk_time * 1000:>9.1f} {bulk_stmts:>11} {legacy_time / bulk_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
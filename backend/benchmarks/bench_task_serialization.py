@@ -0,0 +1,94 @@
+"""Per-row cost of serializing task lists: ORM hydration + TaskOut validation vs projected rows + orjson.
+
+Run from backend/:  python -m benchmarks.bench_task_serialization --rows 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, User, Meeting, Task
+from main import TaskOut, TASK_OUT_FIELDS, TASK_OUT_COLUMNS
+from serializers import rows_to_dicts, dumps
+
+
+def build_db(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with Session() as db:
+        user = User(username="bench", password="x")
+        db.add(user)
+        db.flush()
+        meeting = Meeting(title="Bench", date=now.isoformat(), processed_by_id=user.id)
+        db.add(meeting)
+        db.flush()
+        db.bulk_insert_mappings(Task, [
+            {
+                "description": f"Benchmark task {i} " + "lorem ipsum " * rng.randint(2, 20),
+                "status": rng.choice(["To Do", "Doing", "Submitted", "Done"]),
+                "assignee_id": user.id,
+                "meeting_id": meeting.id,
+                "priority": rng.randint(1, 10),
+                "effort_tag": rng.choice(["small", "medium", "large"]),
+                "created_at": now - timedelta(minutes=i),
+                "last_updated": now,
+                "submitted_at": now - timedelta(hours=1) if i % 3 == 0 else None,
+                "suggested_focus_time": now + timedelta(days=1),
+                "verification_deadline_at": now + timedelta(hours=23) if i % 3 == 0 else None,
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+    return Session
+
+
+def orm_path(db) -> bytes:
+    tasks = db.query(Task).order_by(Task.created_at.desc()).all()
+    validated = TypeAdapter(List[TaskOut]).validate_python(tasks, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def projected_path(db) -> bytes:
+    rows = db.query(*TASK_OUT_COLUMNS).order_by(Task.created_at.desc()).all()
+    return dumps(rows_to_dicts(rows, TASK_OUT_FIELDS))
+
+
+def measure(Session, fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with Session() as db:
+            start = time.perf_counter()
+            fn(db)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'orm us/row':>12} {'projected us/row':>17} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            Session = build_db(os.path.join(tmp, "bench.db"), rows)
+            before = measure(Session, orm_path, args.repeat)
+            after = measure(Session, projected_path, args.repeat)
+        print(f"{rows:>8} {before / rows * 1e6:>12.2f} {after / rows * 1e6:>17.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
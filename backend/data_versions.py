@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+# How long stored versions are trusted while this process has written nothing; bounds how late other processes' writes show up
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "1"))
+
+
+class DataVersions:
+    """Per-table write versions used as cache keys and ETag validators.
+
+    Every commit that wrote to a table bumps an in-process counter (hooked at the engine level, so ORM
+    flushes, bulk and Core statements all count). Once share() is called, the authoritative versions are
+    the table_versions rows that database triggers bump for writes from any process; the local counters
+    are then only the fast path that decides when those rows must be re-read.
+    """
+
+    def __init__(self, poll_seconds: float = DATA_VERSION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._changed_at: Dict[str, float] = {}
+        self._engine: Optional[Engine] = None
+        self._shared: Dict[str, tuple] = {}
+        self._shared_seen: Optional[tuple] = None
+        self._shared_read_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self) -> bool:
+        return self._engine is not None
+
+    def version(self, table: str) -> int:
+        if self.shared:
+            return self._read_shared().get(table, (0, None))[0]
+        return self._versions[table]
+
+    def last_changed(self, *tables: str) -> Optional[float]:
+        # None when none of the tables has a recorded write
+        if self.shared:
+            shared = self._read_shared()
+            stamps = [shared[t][1] for t in tables if t in shared and shared[t][1] is not None]
+        else:
+            stamps = [self._changed_at[t] for t in tables if t in self._changed_at]
+        return max(stamps) if stamps else None
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+                self._changed_at[table] = time.time()
+
+    def share(self, engine: Engine) -> None:
+        # Called by init_db once table_versions and its triggers exist
+        with self._lock:
+            self._engine = engine
+            self._shared_seen = None
+
+    def _read_shared(self) -> Dict[str, tuple]:
+        local = tuple(sorted(self._versions.items()))
+        with self._lock:
+            if local == self._shared_seen and time.monotonic() - self._shared_read_at < self.poll_seconds:
+                return self._shared
+        with self._engine.connect() as conn:
+            rows = conn.execute(text("SELECT name, version, changed_at FROM table_versions")).all()
+        shared = {name: (version, changed_at) for name, version, changed_at in rows}
+        with self._lock:
+            self._shared, self._shared_seen, self._shared_read_at = shared, local, time.monotonic()
+        return shared
+
+    def install(self, engine: Engine) -> None:
+        @event.listens_for(engine, "after_cursor_execute")
+        def _track_write(conn, cursor, statement, parameters, context, executemany):
+            if not (context.isinsert or context.isupdate or context.isdelete):
+                return
+            table = getattr(getattr(context.compiled, "statement", None), "table", None)
+            if table is not None:
+                conn.info.setdefault("written_tables", set()).add(table.name)
+
+        @event.listens_for(engine, "commit")
+        def _publish(conn):
+            written = conn.info.pop("written_tables", None)
+            if written:
+                self.bump(*written)
+
+        @event.listens_for(engine, "rollback")
+        def _discard(conn):
+            conn.info.pop("written_tables", None)
+
+
+data_versions = DataVersions()
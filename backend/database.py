@@ -1,9 +1,14 @@
 # backend/database.py
+import os
+from functools import lru_cache
 from typing import Optional, List, Generator
 from datetime import datetime, timedelta
 
 from sqlalchemy import (
     create_engine,
+    event,
+    inspect,
+    text,
     Integer,
     String,
     Boolean,
@@ -11,9 +16,11 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Float,
+    Index,
     Enum as SQLEnum,
 )
 import enum
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import (
     declarative_base,
     relationship,
@@ -21,11 +28,78 @@ from sqlalchemy.orm import (
     Session,
     Mapped,
     mapped_column,
+    validates,
 )
 
+from data_versions import data_versions
+from migrations import run_migrations
+from scheduler import scheduler
+
 # --- Database Configuration ---
-DATABASE_URL = "sqlite:///./meeting_agent.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./meeting_agent.db")
+# "wal" tunes SQLite for concurrent readers and writers; "basic" is the plain rollback-journal setup
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+SQLITE_ANALYZE_INTERVAL_SECONDS = int(os.getenv("SQLITE_ANALYZE_INTERVAL_SECONDS", "86400"))
+
+ENGINE_PROFILES = ("basic", "wal")
+
+
+def _sqlite_pragmas() -> List[str]:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def make_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE) -> Engine:
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}, expected one of {ENGINE_PROFILES}")
+    if not url.startswith("sqlite"):
+        # Server databases: the profile only matters for SQLite, pool settings apply as-is
+        return create_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+    if profile == "basic" or url in ("sqlite://", "sqlite:///:memory:"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return new_engine
+
+
+engine = make_engine()
+data_versions.install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -33,10 +107,20 @@ Base = declarative_base()
 # --- ORM Models ---
 
 
+def normalize_username(username: str) -> str:
+    # Case- and whitespace-insensitive form used for lookups; "  Priya  S " and "priya s" are the same user
+    return " ".join(username.casefold().split())
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ux_users_username_normalized", "username_normalized", unique=True),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     username: Mapped[str] = mapped_column(String(128), unique=True, index=True, nullable=False)
+    # NULL only for legacy rows that collided with an older user when the column was backfilled
+    username_normalized: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
     password: Mapped[str] = mapped_column(String(256), nullable=False)  # plain text (demo only)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -45,6 +129,11 @@ class User(Base):
     tasks: Mapped[List["Task"]] = relationship("Task", back_populates="assignee", foreign_keys="Task.assignee_id", cascade="all, delete-orphan")
     meetings_processed: Mapped[List["Meeting"]] = relationship("Meeting", back_populates="processed_by", cascade="all, delete-orphan")
 
+    @validates("username")
+    def _normalize(self, key, username):
+        self.username_normalized = normalize_username(username)
+        return username
+
 
 class Token(Base):
     __tablename__ = "tokens"
@@ -56,12 +145,52 @@ class Token(Base):
     user: Mapped["User"] = relationship("User", back_populates="tokens")
 
 
+class StreamTicket(Base):
+    """Single-use, short-lived credential for opening a notification stream, which browsers can only pass in the URL."""
+
+    __tablename__ = "stream_tickets"
+    ticket: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class RevokedToken(Base):
+    """Logged-out token id (a signed token's jti, or a hash of an opaque token), kept until the token would expire anyway."""
+
+    __tablename__ = "revoked_tokens"
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class TokenCutoff(Base):
+    """Tokens a user was issued before not_before (unix seconds) are rejected; set when their username or admin flag changes."""
+
+    __tablename__ = "token_cutoffs"
+    # No foreign key: the cut-off must outlive a deleted user's row
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    not_before: Mapped[float] = mapped_column(Float, nullable=False, index=True)
+
+
+class AudioBlob(Base):
+    """One meeting's use of a stored recording; blobs in the audio store with no live row are deleted."""
+
+    __tablename__ = "audio_blobs"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    sha256: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    filename: Mapped[str] = mapped_column(String(256), nullable=False)
+    meeting_id: Mapped[Optional[int]] = mapped_column(ForeignKey("meetings.id"), index=True, nullable=True)
+    uploaded_by_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+
+
 class Meeting(Base):
     __tablename__ = "meetings"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(256), index=True, nullable=False)
     date: Mapped[str] = mapped_column(String(64), nullable=False)
-    summary_minutes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Deferred: meeting lists select columns explicitly and rarely need the minutes
+    summary_minutes: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     processed_by_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
@@ -76,12 +205,27 @@ class EffortTag(enum.Enum):
     LARGE = "large"
 
 
+# Predicates of the partial task indexes. Queries must repeat them with inlined literals (queries.status_in)
+# for the planner to prove the index applies.
+OPEN_STATUSES = ["To Do", "Doing"]
+OPEN_TASK = "status IN (%s)" % ", ".join(f"'{s}'" for s in OPEN_STATUSES)
+AWAITING_VERIFICATION = "status = 'Submitted' AND verified_at IS NULL"
+UNPLANNED_APPROVED = "is_approved = 1 AND workcycle_id IS NULL"
+UNAPPROVED = "is_approved = 0"
+
+
+def partial_index(name: str, *columns: str, where: str) -> Index:
+    return Index(name, *columns, sqlite_where=text(where), postgresql_where=text(where))
+
+
 class Task(Base):
     __tablename__ = "tasks"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     due_date: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     status: Mapped[str] = mapped_column(String(64), nullable=False, default="To Do")
+    # The free-text notes columns are deferred as one "task_notes" group: loading Task objects
+    # skips them, and reading any one fetches the whole group in a single query
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Agile fields
@@ -94,29 +238,29 @@ class Task(Base):
     # Tracking fields
     progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     is_blocked: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
-    blocker_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    blocker_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="task_notes")
     last_updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Submission & Verification
     submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
-    submission_notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    submission_notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="task_notes")
     submission_url: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     verified_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     verified_by_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
-    verification_notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    verification_notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="task_notes")
     
     # Scrum fields
     story_points: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     sprint_position: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    acceptance_criteria: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    definition_of_done: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    acceptance_criteria: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="task_notes")
+    definition_of_done: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="task_notes")
     
     # AI Proactive Scheduling
     suggested_focus_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # Contextual Risk Detection
     is_potential_risk: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
-    risk_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    risk_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="task_notes")
     
     # Confidence-Based Priority
     needs_priority_review: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
@@ -140,6 +284,26 @@ class Task(Base):
     bundle: Mapped[Optional["BundleGroup"]] = relationship("BundleGroup", back_populates="tasks")
     workcycle: Mapped[Optional["WorkCycle"]] = relationship("WorkCycle", back_populates="tasks")
 
+    # Keyset pagination walks (created_at, id); filters narrow by one column first. The hot queues only ever
+    # read a small slice of the table, so they get partial indexes that writes outside the slice never touch.
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        Index("ix_tasks_assignee_created_at", "assignee_id", "created_at"),
+        Index("ix_tasks_team_id", "team_id"),
+        Index("ix_tasks_bundle_id", "bundle_id"),
+        # /workcycles/{id}/tasks by priority
+        Index("ix_tasks_workcycle_priority", "workcycle_id", "priority"),
+        # /tasks/queue: approved, not in a cycle, by priority then age
+        partial_index("ix_tasks_queue_unplanned", "priority", "created_at", where=UNPLANNED_APPROVED),
+        # /tasks/review and ?is_approved=false: unapproved by confidence then age
+        partial_index("ix_tasks_review_unapproved", "confidence", "created_at", where=UNAPPROVED),
+        # SLA views and scan, /tasks/pending-verification: Submitted and unverified, by deadline
+        partial_index("ix_tasks_awaiting_verification", "verification_deadline_at", where=AWAITING_VERIFICATION),
+        # End-of-day planning: a user's To Do / Doing tasks
+        partial_index("ix_tasks_open_assignee", "assignee_id", where=OPEN_TASK),
+    )
+
 
 class WorkCycle(Base):
     __tablename__ = "work_cycles"
@@ -178,6 +342,9 @@ class ProgressSnapshot(Base):
 
     workcycle: Mapped["WorkCycle"] = relationship("WorkCycle", back_populates="snapshots")
 
+    # One snapshot per cycle per day; burndown reads are a range on this index
+    __table_args__ = (Index("ux_progress_snapshots_cycle_date", "workcycle_id", "snapshot_date", unique=True),)
+
 
 class Team(Base):
     __tablename__ = "teams"
@@ -214,12 +381,209 @@ class Notification(Base):
     user: Mapped["User"] = relationship("User")
     task: Mapped[Optional["Task"]] = relationship("Task")
 
+    __table_args__ = (Index("ix_notifications_user_created", "user_id", "created_at"),)
+
+
+class TaskDailyRollup(Base):
+    """Per created-day, team and assignee task counters, kept current by SQLite triggers on tasks."""
+
+    __tablename__ = "task_daily_rollup"
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    team_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)  # 0 = no team
+    assignee_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    blocked: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completion_hours: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+def _rollup_upsert(row: str, sign: str) -> str:
+    return f"""
+    INSERT INTO task_daily_rollup (day, team_id, assignee_id, created, completed, blocked, completion_hours)
+    VALUES (
+        date({row}.created_at), COALESCE({row}.team_id, 0), {row}.assignee_id,
+        {sign}1,
+        {sign}({row}.status = 'Done'),
+        {sign}({row}.is_blocked = 1),
+        {sign}(CASE WHEN {row}.status = 'Done' THEN (julianday({row}.last_updated) - julianday({row}.created_at)) * 24 ELSE 0 END)
+    )
+    ON CONFLICT (day, team_id, assignee_id) DO UPDATE SET
+        created = created + excluded.created,
+        completed = completed + excluded.completed,
+        blocked = blocked + excluded.blocked,
+        completion_hours = completion_hours + excluded.completion_hours;"""
+
+
+# Triggers see every write, including bulk and set-based statements that skip ORM events
+ROLLUP_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_tasks_rollup_insert AFTER INSERT ON tasks BEGIN {_rollup_upsert('NEW', '+')} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_tasks_rollup_delete AFTER DELETE ON tasks BEGIN {_rollup_upsert('OLD', '-')} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_tasks_rollup_update "
+    "AFTER UPDATE OF status, is_blocked, last_updated, created_at, team_id, assignee_id ON tasks "
+    f"BEGIN {_rollup_upsert('OLD', '-')} {_rollup_upsert('NEW', '+')} END",
+]
+
+ROLLUP_BACKFILL = """
+INSERT INTO task_daily_rollup (day, team_id, assignee_id, created, completed, blocked, completion_hours)
+SELECT date(created_at), COALESCE(team_id, 0), assignee_id,
+       COUNT(*),
+       SUM(status = 'Done'),
+       SUM(is_blocked = 1),
+       SUM(CASE WHEN status = 'Done' THEN (julianday(last_updated) - julianday(created_at)) * 24 ELSE 0 END)
+FROM tasks
+GROUP BY 1, 2, 3
+"""
+
+
+# External-content FTS5 indexes: the text lives in tasks/meetings, the virtual tables hold only the index
+SEARCH_INDEXES = {
+    "tasks_fts": ("tasks", ["description", "acceptance_criteria", "blocker_reason"]),
+    "meetings_fts": ("meetings", ["title", "summary_minutes"]),
+}
+
+
+def _search_ddl(fts: str, table: str, columns: List[str]) -> List[str]:
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{c}" for c in columns)
+    old_values = ", ".join(f"OLD.{c}" for c in columns)
+    remove = f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old_values});"
+    add = f"INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table} BEGIN {remove} {add} END",
+    ]
+
+
+class TableVersion(Base):
+    """Write counter per table, bumped by SQLite triggers so every process sees every other process's writes."""
+
+    __tablename__ = "table_versions"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    changed_at: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+# Tables whose versions back ETags and in-process caches
+VERSIONED_TABLES = ("tasks", "users", "meetings", "work_cycles", "bundle_groups")
+_UNIX_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+
+
+def _version_bump(table: str) -> str:
+    return f"UPDATE table_versions SET version = version + 1, changed_at = {_UNIX_NOW} WHERE name = '{table}';"
+
+
+VERSION_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{op.lower()} AFTER {op} ON {table} BEGIN {_version_bump(table)} END"
+    for table in VERSIONED_TABLES
+    for op in ("INSERT", "UPDATE", "DELETE")
+]
+# Random starting points, so a recreated database never reproduces an ETag clients still hold
+VERSION_SEED = f"INSERT OR IGNORE INTO table_versions (name, version, changed_at) VALUES (:name, abs(random() % 1000000000), {_UNIX_NOW})"
+
+
+def bump_table_versions(conn, tables=VERSIONED_TABLES) -> None:
+    # For loads that ran with the version triggers dropped
+    for table in tables:
+        conn.execute(text(_version_bump(table)))
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="queued")
+    stage: Mapped[str] = mapped_column(String(64), nullable=False, default="queued")
+    progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    payload: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    meeting_id: Mapped[Optional[int]] = mapped_column(ForeignKey("meetings.id"), nullable=True)
+    created_by_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    meeting: Mapped[Optional["Meeting"]] = relationship("Meeting")
+
+    # Workers claim the oldest queued job
+    __table_args__ = (Index("ix_jobs_status_id", "status", "id"),)
+
 
 # --- Utility functions ---
 
 
 def init_db() -> None:
+    existing = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    if rollup_enabled():
+        with engine.begin() as conn:
+            for statement in ROLLUP_TRIGGERS:
+                conn.execute(text(statement))
+            if TaskDailyRollup.__tablename__ not in existing:
+                conn.execute(text(ROLLUP_BACKFILL))
+    if search_enabled():
+        with engine.begin() as conn:
+            for fts, (table, columns) in SEARCH_INDEXES.items():
+                for statement in _search_ddl(fts, table, columns):
+                    conn.execute(text(statement))
+                if fts not in existing:
+                    conn.execute(text(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"))
+    # Other dialects keep the per-process counters only
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text(VERSION_SEED), [{"name": table} for table in VERSIONED_TABLES])
+            for statement in VERSION_TRIGGERS:
+                conn.execute(text(statement))
+        data_versions.share(engine)
+    run_migrations(engine, Base.metadata)
+    if engine.dialect.name == "sqlite" and "sqlite_stat1" not in existing:
+        refresh_planner_stats()
+
+
+def refresh_planner_stats() -> None:
+    # Without sqlite_stat1 the planner cannot tell that a partial index holds only a sliver of the table
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA analysis_limit=1000")
+        conn.exec_driver_sql("ANALYZE")
+    # Connections only read sqlite_stat1 along with the schema, which ANALYZE leaves unchanged once the table
+    # exists, so pooled connections would plan with the old statistics until they were reopened
+    engine.dispose()
+
+
+def rollup_enabled() -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+@lru_cache(maxsize=1)
+def search_enabled() -> bool:
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return bool(conn.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def rebuild_task_rollup(db: Session) -> int:
+    db.execute(text("DELETE FROM task_daily_rollup"))
+    db.execute(text(ROLLUP_BACKFILL))
+    db.commit()
+    return db.query(TaskDailyRollup).count()
+
+
+def rebuild_search_index(db: Session) -> int:
+    for fts in SEARCH_INDEXES:
+        db.execute(text(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"))
+    db.commit()
+    return sum(db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table, _ in SEARCH_INDEXES.values())
+
+
+@scheduler.every(SQLITE_ANALYZE_INTERVAL_SECONDS, "refresh_planner_stats")
+def _refresh_planner_stats_job() -> None:
+    refresh_planner_stats()
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -231,7 +595,7 @@ def get_db() -> Generator[Session, None, None]:
 
 
 def get_or_create_user(db: Session, username: str, password: str = "changeme", is_admin: bool = False) -> User:
-    user = db.query(User).filter(User.username == username).first()
+    user = db.query(User).filter(User.username_normalized == normalize_username(username)).first()
     if user:
         return user
     new_user = User(username=username, password=password, is_admin=is_admin)
@@ -0,0 +1,51 @@
+import time
+import uuid
+import hashlib
+from email.utils import formatdate
+from typing import Dict, Iterable, Optional
+
+from fastapi import Response
+
+from data_versions import data_versions
+
+# Per-process versions restart from zero, so the boot id keeps old ETags from matching new data
+BOOT_ID = uuid.uuid4().hex
+BOOT_TIME = time.time()
+
+
+class CollectionETag:
+    """Validator for a response built from whole tables, derived from their write versions, not the payload.
+
+    Checking it costs at most one small table_versions read and no serialization, so a matching
+    If-None-Match is answered with an empty 304 before the endpoint queries the tables themselves.
+    """
+
+    def __init__(self, tables: Iterable[str], parts: Iterable = (), if_none_match: Optional[str] = None):
+        self.tables = tuple(tables)
+        self.if_none_match = if_none_match
+        # Database-backed versions mean the same thing in every process, so workers and restarts share ETags
+        epoch = "shared" if data_versions.shared else BOOT_ID
+        stamp = "|".join([epoch, *(f"{t}:{data_versions.version(t)}" for t in self.tables), *map(str, parts)])
+        self.etag = 'W/"%s"' % hashlib.sha1(stamp.encode()).hexdigest()[:24]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        changed = data_versions.last_changed(*self.tables) or BOOT_TIME
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(changed, usegmt=True),
+            # Always revalidate; the 304 path is cheap
+            "Cache-Control": "private, no-cache",
+        }
+
+    def matches(self) -> bool:
+        if not self.if_none_match:
+            return False
+        candidates = [tag.strip() for tag in self.if_none_match.split(",")]
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        return "*" in candidates or any(tag.removeprefix("W/") == self.etag.removeprefix("W/") for tag in candidates)
+
+    def not_modified(self) -> Optional[Response]:
+        if self.matches():
+            return Response(status_code=304, headers=self.headers)
+        return None
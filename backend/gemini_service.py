@@ -1,12 +1,177 @@
 import os
+import re
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Callable, Any, Optional
+
+from llm_cache import llm_cache, make_key, MISSING
 
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+MODEL_NAME = "gemini-2.0-flash-exp"
+model = genai.GenerativeModel(MODEL_NAME)
+
+# Part of every cache key: bump an entry whenever its prompt text changes
+PROMPT_VERSIONS = {"extract_tasks": 1, "summary": 1, "summary_combine": 1, "capture": 1}
+
+# Gemini calls block, so they run on a bounded pool instead of the event loop
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "8"))
+llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS, thread_name_prefix="llm")
+
+
+# Long transcripts are split into overlapping chunks and processed map-reduce style
+LLM_CHUNK_CHARS = int(os.getenv("LLM_CHUNK_CHARS", "12000"))
+LLM_CHUNK_OVERLAP_CHARS = int(os.getenv("LLM_CHUNK_OVERLAP_CHARS", "800"))
+LLM_CHUNK_FANOUT = int(os.getenv("LLM_CHUNK_FANOUT", "4"))
+# Separate pool so chunk calls never wait on the pool their parent call is running in
+chunk_executor = ThreadPoolExecutor(max_workers=LLM_CHUNK_FANOUT, thread_name_prefix="llm-chunk")
+
+SPEAKER_TURN = re.compile(r"^\s*(\[[^\]]*\]\s*)?[A-Z][\w .'-]{0,40}:")
+
+
+async def run_llm(func: Callable[..., Any], *args) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(llm_executor, func, *args)
+
+
+def _cached(kind: str, text: str, use_cache: bool, compute: Callable[[], Any]) -> Any:
+    # Only successful answers reach put(); fallbacks raised from compute are never stored
+    key = make_key(MODEL_NAME, f"{kind}:v{PROMPT_VERSIONS[kind]}", text)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not MISSING:
+            return cached
+    result = compute()
+    llm_cache.put(key, result)
+    return result
+
+
+def _split_units(transcript: str) -> List[str]:
+    # Natural break points: blank-line paragraphs and speaker turns ("Priya: ...")
+    units: List[str] = []
+    current: List[str] = []
+    for line in transcript.splitlines():
+        if not line.strip() or SPEAKER_TURN.match(line):
+            if current:
+                units.append("\n".join(current))
+                current = []
+        if line.strip():
+            current.append(line)
+    if current:
+        units.append("\n".join(current))
+    return units
+
+
+def chunk_transcript(transcript: str, max_chars: Optional[int] = None, overlap_chars: Optional[int] = None) -> List[str]:
+    max_chars = max_chars or LLM_CHUNK_CHARS
+    overlap_chars = LLM_CHUNK_OVERLAP_CHARS if overlap_chars is None else overlap_chars
+    if len(transcript) <= max_chars:
+        return [transcript]
+
+    units: List[str] = []
+    for unit in _split_units(transcript):
+        # A single monologue longer than a chunk is cut on line/whitespace boundaries
+        while len(unit) > max_chars:
+            cut = unit.rfind("\n", 0, max_chars)
+            if cut <= 0:
+                cut = unit.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            units.append(unit[:cut])
+            unit = unit[cut:].lstrip()
+        if unit:
+            units.append(unit)
 
-def extract_tasks_from_transcript(transcript: str) -> List[Dict]:
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit in units:
+        if current and size + len(unit) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            # Carry trailing turns forward so tasks spanning the boundary are seen whole
+            carried: List[str] = []
+            carried_size = 0
+            for prev in reversed(current):
+                if carried_size + len(prev) + 1 > overlap_chars or carried_size + len(prev) + len(unit) + 2 > max_chars:
+                    break
+                carried.insert(0, prev)
+                carried_size += len(prev) + 1
+            current, size = carried, carried_size
+        current.append(unit)
+        size += len(unit) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _parse_json(text: str):
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    return json.loads(text.strip())
+
+
+def _task_key_words(task: Dict) -> set:
+    return set(re.findall(r"[a-z0-9]+", str(task.get("description", "")).lower()))
+
+
+def merge_extracted_tasks(task_lists: List[List[Dict]], similarity: float = 0.8) -> List[Dict]:
+    # Overlapping chunks report the same action item twice, often worded slightly differently
+    merged: List[Dict] = []
+    merged_words: List[set] = []
+    for tasks in task_lists:
+        for task in tasks:
+            if not isinstance(task, dict):
+                continue
+            words = _task_key_words(task)
+            assignee = str(task.get("assignee") or "").strip().lower()
+            duplicate = None
+            for i, existing in enumerate(merged):
+                if str(existing.get("assignee") or "").strip().lower() != assignee:
+                    continue
+                union = words | merged_words[i]
+                if union and len(words & merged_words[i]) / len(union) >= similarity:
+                    duplicate = i
+                    break
+            if duplicate is None:
+                merged.append(dict(task))
+                merged_words.append(words)
+                continue
+            existing = merged[duplicate]
+            if (task.get("confidence") or 0) > (existing.get("confidence") or 0):
+                existing["confidence"] = task.get("confidence")
+            if (task.get("priority") or 0) > (existing.get("priority") or 0):
+                existing["priority"] = task.get("priority")
+            if task.get("due_date") and (not existing.get("due_date") or task["due_date"] < existing["due_date"]):
+                existing["due_date"] = task["due_date"]
+            if task.get("is_potential_risk") and not existing.get("is_potential_risk"):
+                existing["is_potential_risk"] = True
+                existing["risk_reason"] = task.get("risk_reason")
+    return merged
+
+
+def extract_tasks_from_transcript(transcript: str, use_cache: bool = True) -> List[Dict]:
+    chunks = chunk_transcript(transcript)
+    if len(chunks) == 1:
+        return extract_tasks_from_chunk(transcript, use_cache=use_cache)
+    extract = partial(extract_tasks_from_chunk, use_cache=use_cache)
+    return merge_extracted_tasks(list(chunk_executor.map(extract, chunks)))
+
+
+def generate_meeting_summary(transcript: str, use_cache: bool = True) -> str:
+    chunks = chunk_transcript(transcript)
+    if len(chunks) == 1:
+        return summarize_chunk(transcript, use_cache=use_cache)
+    partials = list(chunk_executor.map(partial(summarize_chunk, use_cache=use_cache), chunks))
+    combined = "\n\n".join(f"Part {i + 1}: {p}" for i, p in enumerate(partials))
+    return summarize_chunk(combined, combining=True, use_cache=use_cache)
+
+
+def extract_tasks_from_chunk(transcript: str, use_cache: bool = True) -> List[Dict]:
     prompt = f"""Analyze this meeting transcript and extract action items/tasks.
 For each task, identify:
 - assignee: person's name who should do it
@@ -24,31 +189,37 @@ Return ONLY valid JSON array, no markdown:
 Transcript:
 {transcript}"""
 
+    def call() -> List[Dict]:
+        tasks = _parse_json(model.generate_content(prompt).text)
+        if not isinstance(tasks, list):
+            raise ValueError("expected a JSON array of tasks")
+        return tasks
+
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-        return json.loads(text.strip())
+        return _cached("extract_tasks", transcript, use_cache, call)
     except Exception as e:
         print(f"Gemini error: {e}")
         return []
 
-def generate_meeting_summary(transcript: str) -> str:
-    prompt = f"""Summarize this meeting in 2-3 sentences focusing on key decisions and outcomes.
+def summarize_chunk(transcript: str, combining: bool = False, use_cache: bool = True) -> str:
+    if combining:
+        prompt = f"""These are summaries of consecutive parts of one meeting. Combine them into a single 2-3 sentence summary focusing on key decisions and outcomes.
+
+Summaries:
+{transcript}"""
+    else:
+        prompt = f"""Summarize this meeting in 2-3 sentences focusing on key decisions and outcomes.
 
 Transcript:
 {transcript}"""
 
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return _cached("summary_combine" if combining else "summary", transcript, use_cache,
+                       lambda: model.generate_content(prompt).text.strip())
     except Exception:
         return transcript[:500] + "..."
 
-def extract_task_from_capture(text: str) -> Dict:
+def extract_task_from_capture(text: str, use_cache: bool = True) -> Dict:
     prompt = f"""Extract a task from this quick note/idea.
 Identify:
 - description: what needs to be done
@@ -61,13 +232,7 @@ Note:
 {text}"""
 
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-        return json.loads(text.strip())
+        return _cached("capture", text, use_cache, lambda: _parse_json(model.generate_content(prompt).text))
     except Exception as e:
         print(f"Capture error: {e}")
         return {"description": text[:200], "assignee": "unassigned"}
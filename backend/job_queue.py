@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+from typing import Any, Optional, Callable, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, Job, Meeting, Task
+from scheduler import scheduler
+from audio_service import transcribe_audio, record_audio
+from gemini_service import llm_executor, generate_meeting_summary, extract_tasks_from_transcript
+from task_service import save_extracted_tasks
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+# A running job whose heartbeat is older than this is presumed dead and handed to another worker
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_FAILURE_RETRIES = 3
+
+
+class JobLeaseLost(Exception):
+    pass
+
+
+def enqueue_job(db: Session, kind: str, payload: Optional[str] = None, meeting_id: Optional[int] = None, created_by_id: Optional[int] = None) -> Job:
+    job = Job(kind=kind, status="queued", stage="queued", payload=payload, meeting_id=meeting_id, created_by_id=created_by_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    worker_pool.notify()
+    return job
+
+
+def enqueue_meeting_processing(db: Session, title: str, meeting_date: str, processed_by_id: int, transcript: Optional[str],
+                               use_cache: bool = True, audio: Optional[dict] = None) -> Job:
+    # audio ({"sha256", "filename", "transcriber"}) stands in for the transcript; the worker transcribes it
+    meeting = Meeting(title=title, date=meeting_date, processed_by_id=processed_by_id)
+    db.add(meeting)
+    db.flush()
+    if audio:
+        record_audio(db, audio, meeting.id, processed_by_id)
+    payload = json.dumps({"transcript": transcript, "use_cache": use_cache, "audio": audio})
+    return enqueue_job(db, "process_meeting", payload=payload, meeting_id=meeting.id, created_by_id=processed_by_id)
+
+
+def requeue_expired_jobs(db: Session, lease_seconds: float = JOB_LEASE_SECONDS) -> int:
+    # Only jobs nobody has heartbeated for a whole lease: a sibling process may still be running the rest
+    expired = (Job.status == "running") & (func.coalesce(Job.heartbeat_at, Job.started_at) < datetime.utcnow() - timedelta(seconds=lease_seconds))
+    count = db.query(Job).filter(expired, Job.attempts < JOB_MAX_ATTEMPTS).update(
+        {Job.status: "queued", Job.stage: "requeued"}, synchronize_session=False
+    )
+    count += db.query(Job).filter(expired).update(
+        {Job.status: "failed", Job.stage: "failed", Job.error: "Worker stopped responding", Job.finished_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    db.commit()
+    return count
+
+
+def claim_next_job(db: Session) -> Optional[Job]:
+    while True:
+        candidate = db.query(Job.id).filter(Job.status == "queued").order_by(Job.id).first()
+        if not candidate:
+            return None
+        claimed = db.query(Job).filter(Job.id == candidate.id, Job.status == "queued").update(
+            {
+                Job.status: "running",
+                Job.stage: "starting",
+                Job.attempts: Job.attempts + 1,
+                Job.started_at: datetime.utcnow(),
+                Job.heartbeat_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        if claimed == 1:
+            job = db.get(Job, candidate.id)
+            # Detached, so job.attempts stays this claim's attempt: an attached copy would reload after every
+            # commit and pick up the attempt of whichever worker reclaimed it, defeating the ownership checks
+            db.expunge(job)
+            return job
+
+
+def set_job_stage(db: Session, job: Job, stage: str, progress: int, commit: bool = True) -> None:
+    # Doubles as the lease heartbeat, and stops the handler if another worker has reclaimed the job
+    owned = db.query(Job).filter(Job.id == job.id, Job.status == "running", Job.attempts == job.attempts).update(
+        {Job.stage: stage, Job.progress: progress, Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+    )
+    if not owned:
+        raise JobLeaseLost(f"job {job.id} was reclaimed by another worker")
+    if commit:
+        db.commit()
+
+
+def wait_for(db: Session, job: Job, future: Future, stage: str, progress: int) -> Any:
+    # Long Gemini calls keep renewing the lease while the worker waits on them
+    while True:
+        try:
+            return future.result(timeout=JOB_LEASE_SECONDS / 3)
+        except FutureTimeout:
+            set_job_stage(db, job, stage, progress)
+
+
+def run_meeting_job(db: Session, job: Job) -> None:
+    payload = json.loads(job.payload)
+    transcript = payload.get("transcript")
+    if not transcript and payload.get("audio"):
+        audio = payload["audio"]
+        set_job_stage(db, job, "transcribing", 5)
+        transcript = transcribe_audio(audio["sha256"], audio["filename"], audio.get("transcriber"))
+    set_job_stage(db, job, "analyzing", 10)
+    summary_future = llm_executor.submit(generate_meeting_summary, transcript, payload.get("use_cache", True))
+    tasks_future = llm_executor.submit(extract_tasks_from_transcript, transcript, payload.get("use_cache", True))
+    summary = wait_for(db, job, summary_future, "analyzing", 10)
+    ai_tasks = wait_for(db, job, tasks_future, "analyzing", 10)
+
+    # Not committed on its own: the ownership check holds the write lock until the tasks are saved
+    set_job_stage(db, job, "saving", 70, commit=False)
+    meeting = db.get(Meeting, job.meeting_id)
+    meeting.summary_minutes = summary
+    if job.attempts > 1:
+        # A previous attempt may have saved part of the batch before dying
+        db.query(Task).filter(Task.meeting_id == meeting.id).delete(synchronize_session=False)
+    save_extracted_tasks(db, ai_tasks, meeting.id)
+
+
+JOB_HANDLERS: Dict[str, Callable[[Session, Job], None]] = {
+    "process_meeting": run_meeting_job,
+}
+
+
+def finish_job(db: Session, job_id: int, attempts: int, values: dict) -> bool:
+    finished = db.query(Job).filter(Job.id == job_id, Job.status == "running", Job.attempts == attempts).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+    return bool(finished)
+
+
+def run_job(db: Session, job: Job) -> None:
+    job_id, kind, attempts = job.id, job.kind, job.attempts
+    try:
+        JOB_HANDLERS[kind](db, job)
+        finish_job(db, job_id, attempts, {
+            Job.status: "done", Job.stage: "done", Job.progress: 100, Job.error: None, Job.finished_at: datetime.utcnow(),
+        })
+        return
+    except JobLeaseLost as e:
+        db.rollback()
+        print(f"Job {job_id} ({kind}) abandoned: {e}")
+        return
+    except Exception as e:
+        db.rollback()
+        error = str(e)
+    print(f"Job {job_id} ({kind}) failed on attempt {attempts}: {error}")
+
+    if attempts < JOB_MAX_ATTEMPTS:
+        values = {Job.status: "queued", Job.stage: "retrying", Job.error: error}
+    else:
+        values = {Job.status: "failed", Job.stage: "failed", Job.error: error, Job.finished_at: datetime.utcnow()}
+    for _ in range(JOB_FAILURE_RETRIES):
+        try:
+            finish_job(db, job_id, attempts, values)
+            return
+        except Exception as e:
+            db.rollback()
+            print(f"Could not record the failure of job {job_id}: {e}")
+            time.sleep(JOB_POLL_SECONDS)
+    # Left "running": requeue_expired_jobs hands it out again once the lease runs out
+
+
+class JobWorkerPool:
+    """Threads that drain the jobs table; the table itself is the queue, so no broker is needed."""
+
+    def __init__(self, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with SessionLocal() as db:
+                    try:
+                        job = claim_next_job(db)
+                        if job:
+                            run_job(db, job)
+                            continue
+                    except Exception:
+                        db.rollback()
+                        raise
+            except Exception as e:
+                # e.g. "database is locked": keep the thread alive and try again after a pause
+                print(f"Job worker {threading.current_thread().name} error: {e}")
+                self._stop.wait(self.poll_seconds)
+                continue
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        with SessionLocal() as db:
+            requeued = requeue_expired_jobs(db)
+        if requeued:
+            print(f"Recovered {requeued} job(s) whose worker stopped responding")
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+
+worker_pool = JobWorkerPool()
+
+
+@scheduler.every(JOB_LEASE_SECONDS / 2, "requeue_expired_jobs")
+def _requeue_expired_jobs_job() -> None:
+    with SessionLocal() as db:
+        requeue_expired_jobs(db)
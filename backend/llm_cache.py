@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from scheduler import scheduler
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+LLM_CACHE_EVICT_INTERVAL_SECONDS = int(os.getenv("LLM_CACHE_EVICT_INTERVAL_SECONDS", "3600"))
+EVICT_EVERY_WRITES = 100
+
+MISSING = object()
+
+
+def make_key(model_name: str, template: str, text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, template, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """Content-addressed store of Gemini results in its own SQLite file, evicted by age and total size."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, enabled: bool = LLM_CACHE_ENABLED,
+                 max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024), max_age_seconds: float = LLM_CACHE_MAX_AGE_DAYS * 86400):
+        self.path = path
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Any:
+        if not self.enabled:
+            return MISSING
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return MISSING
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        data = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            conn.commit()
+            self.writes += 1
+            if self.writes % EVICT_EVERY_WRITES == 0:
+                self._evict(conn)
+
+    def evict(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._evict(self._connection())
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        removed = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.max_age_seconds,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop least recently used entries until back under the size budget
+            freed = 0
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at"):
+                if total - freed <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                freed += size
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+            removed += len(doomed)
+        conn.commit()
+        self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        entries, size = 0, 0
+        if self.enabled:
+            with self._lock:
+                entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+llm_cache = LLMCache()
+
+
+@scheduler.every(LLM_CACHE_EVICT_INTERVAL_SECONDS, "evict_llm_cache")
+def _evict_llm_cache_job() -> None:
+    llm_cache.evict()
@@ -1,21 +1,27 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import os
+import time
+import base64
+import asyncio
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Body
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Body, Query, Request, Response
 
 load_dotenv()
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, validator
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from database import (
     init_db,
     get_db,
+    SessionLocal,
     get_or_create_user,
-    create_token_for_user,
     User,
     Token,
     Meeting,
@@ -26,27 +32,106 @@ from database import (
     Team,
     TeamMember,
     Notification,
+    Job,
+    normalize_username,
+)
+from audio_service import TRANSCRIPTION_BACKENDS, UploadTooLarge, audio_store, transcribe_audio
+from gemini_service import extract_tasks_from_transcript, generate_meeting_summary, extract_task_from_capture, run_llm
+from task_service import find_user_by_username, resolve_assignees, save_processed_meeting, bulk_update_tasks
+from user_directory import user_directory
+from analytics_service import BRIEFING_CACHE_SECONDS, get_daily_briefing, get_productivity_analytics, detect_blockers_from_transcript
+from serializers import entity_columns, task_columns, parse_fields, rows_response, sparse_model, dumps, FastJSONResponse
+from etags import CollectionETag
+from search_service import SEARCH_KINDS, search
+from llm_cache import llm_cache
+from auth_service import token_cache, cached_token, issue_token, revoke_token, is_signed_token, verify_signed_token, issue_stream_ticket, redeem_stream_ticket, STREAM_TICKET_SECONDS
+from scheduler import scheduler
+from job_queue import worker_pool, enqueue_meeting_processing
+from sla_service import scan_sla_breaches
+from workflow_service import submit_for_review, record_verification, approve_by_manager, plan_tomorrow_for_user, plan_tomorrow_for_team
+from workcycle_service import capture_progress_snapshots, get_burndown, get_workcycle_snapshot
+from notification_hub import notification_hub, notification_payload, CLOSED, NOTIFY_HEARTBEAT_SECONDS
+from queries import (
+    task_list_query, my_tasks_query, priority_queue_query, review_queue_query, pending_verification_query,
+    sla_breached_query, workcycle_tasks_query, bundle_tasks_query, notifications_query,
 )
-from gemini_service import extract_tasks_from_transcript, generate_meeting_summary, extract_task_from_capture
-from analytics_service import get_daily_briefing, get_productivity_analytics, detect_blockers_from_transcript
 
 # Constants
-DEFAULT_PASSWORD = "changeme"
 TASK_PREFIX = "TASK:"
 SUMMARY_MAX_LENGTH = 800
 SUMMARY_PREVIEW_LENGTH = 200
+MAX_PAGE_SIZE = 500
+MAX_SEARCH_RESULTS = 100
+MAX_BULK_ITEMS = 1000
 
 # Initialize DB
 init_db()
 
 app = FastAPI(title="Meeting Agent API")
 
+@app.on_event("startup")
+def start_background_jobs():
+    # Catch up on work missed while the server was down, then the scheduler takes over
+    with SessionLocal() as db:
+        scan_sla_breaches(db)
+        capture_progress_snapshots(db)
+    scheduler.start()
+    worker_pool.start()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    notification_hub.close_all()
+    scheduler.stop()
+    worker_pool.stop()
+
+class UploadSizeLimit:
+    """Rejects oversized uploads before Starlette spools the multipart body to disk.
+
+    A declared Content-Length over the limit is answered 413 without reading the body; chunked uploads are
+    counted as they arrive and cut off once they pass it.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...], max_bytes: int, detail: str):
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+        self.detail = detail
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            return await JSONResponse(status_code=413, content={"detail": self.detail})(scope, receive, send)
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > self.max_bytes:
+                # Raised inside form parsing, which lets HTTPException through as the response
+                raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# The form fields around the recording get a megabyte on top of the audio cap
+app.add_middleware(
+    UploadSizeLimit,
+    paths=("/meetings/process",),
+    max_bytes=audio_store.max_bytes + 1024 * 1024,
+    detail=f"Audio upload exceeds {audio_store.max_bytes // (1024 * 1024)} MB",
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -97,6 +182,14 @@ class TaskUpdateRequest(BaseModel):
     acceptance_criteria: Optional[str] = None
     definition_of_done: Optional[str] = None
 
+class TaskBulkItem(TaskUpdateRequest):
+    id: int
+
+class TaskBulkUpdateRequest(BaseModel):
+    updates: List[TaskBulkItem] = []
+    # Task ids in board order; each task's sprint_position becomes its index in this list
+    sprint_order: Optional[List[int]] = None
+
 class TaskSubmissionRequest(BaseModel):
     submission_notes: str
     submission_url: Optional[str] = None
@@ -107,6 +200,7 @@ class TaskVerificationRequest(BaseModel):
 
 class TaskCaptureRequest(BaseModel):
     text: str
+    bypass_cache: bool = False
 
 class TeamRequest(BaseModel):
     name: str
@@ -164,20 +258,21 @@ class TaskOut(BaseModel):
     progress: int = 0
     is_blocked: bool = False
     blocker_reason: Optional[str] = None
-    submitted_at: Optional[str] = None
+    submitted_at: Optional[datetime] = None
     submission_notes: Optional[str] = None
     submission_url: Optional[str] = None
-    verified_at: Optional[str] = None
+    verified_at: Optional[datetime] = None
     verified_by_id: Optional[int] = None
     verification_notes: Optional[str] = None
     story_points: Optional[int] = None
+    sprint_position: int = 0
     acceptance_criteria: Optional[str] = None
     definition_of_done: Optional[str] = None
     is_potential_risk: bool = False
     risk_reason: Optional[str] = None
     needs_priority_review: bool = False
-    suggested_focus_time: Optional[str] = None
-    verification_deadline_at: Optional[str] = None
+    suggested_focus_time: Optional[datetime] = None
+    verification_deadline_at: Optional[datetime] = None
     sla_breached: bool = False
     team_id: Optional[int] = None
     
@@ -185,6 +280,16 @@ class TaskOut(BaseModel):
         orm_mode = True
 
 
+# Task lists skip ORM hydration and TaskOut validation: these columns are selected as
+# plain rows and encoded directly (see serializers.py); fields= narrows them per request
+TASK_OUT_FIELDS = tuple(TaskOut.__fields__)
+TASK_OUT_COLUMNS = task_columns(TASK_OUT_FIELDS)
+MEETING_OUT_FIELDS = tuple(MeetingOut.__fields__)
+# List endpoints honour fields=, so their documented items may omit anything but id
+TaskFields = sparse_model(TaskOut)
+MeetingFields = sparse_model(MeetingOut)
+
+
 class WorkCycleOut(BaseModel):
     id: int
     name: str
@@ -207,6 +312,23 @@ class BundleGroupOut(BaseModel):
         orm_mode = True
 
 
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    stage: str
+    progress: int
+    attempts: int
+    error: Optional[str]
+    meeting_id: Optional[int]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        orm_mode = True
+
+
 class ProgressSnapshotOut(BaseModel):
     id: int
     workcycle_id: int
@@ -216,12 +338,30 @@ class ProgressSnapshotOut(BaseModel):
     class Config:
         orm_mode = True
 
+class BurndownOut(BaseModel):
+    workcycle_id: int
+    cycle_name: str
+    start_date: str
+    end_date: str
+    snapshots: List[ProgressSnapshotOut]
+
 
 # Auth helpers
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     if not token:
         raise HTTPException(status_code=401, detail="Missing token")
     
+    if is_signed_token(token):
+        claims = verify_signed_token(token)
+        if not claims:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        return User(id=claims.user_id, username=claims.username, is_admin=claims.is_admin)
+    
+    cached = cached_token(token)
+    if cached:
+        # Detached stand-in so steady-state auth issues no queries
+        return User(id=cached.user_id, username=cached.username, is_admin=cached.is_admin)
+    
     tok = db.query(Token).filter(Token.token == token).first()
     if not tok or tok.expires_at < datetime.utcnow():
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -229,6 +369,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     user = db.query(User).filter(User.id == tok.user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    token_cache.put(token, user.id, user.username, user.is_admin, tok.expires_at)
     return user
 
 def admin_required(current_user: User = Depends(get_current_user)) -> User:
@@ -236,11 +377,25 @@ def admin_required(current_user: User = Depends(get_current_user)) -> User:
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
-def find_user_by_username(db: Session, username: str) -> Optional[User]:
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        user = db.query(User).filter(User.username.ilike(username)).first()
-    return user
+def conditional(*tables: str, per_user: bool = True):
+    # Dependency: validator for a response built from these tables; also stamps it on non-Response returns
+    def dependency(request: Request, response: Response, current_user: User = Depends(get_current_user)) -> CollectionETag:
+        parts = [request.url.path, request.url.query, current_user.id if per_user else ""]
+        check = CollectionETag(tables, parts, request.headers.get("If-None-Match"))
+        response.headers.update(check.headers)
+        return check
+    return dependency
+
+def sparse_fields(allowed: Tuple[str, ...]):
+    # Dependency: the fields= subset a list endpoint selects and returns; everything when omitted
+    def dependency(fields: Optional[str] = Query(None, description="Comma-separated fields to return; id is always included")) -> Tuple[str, ...]:
+        try:
+            return parse_fields(fields, allowed)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return dependency
+
+task_fields = sparse_fields(TASK_OUT_FIELDS)
 
 def create_summary(text: str) -> str:
     text = text.strip()
@@ -248,21 +403,16 @@ def create_summary(text: str) -> str:
         return text[:SUMMARY_MAX_LENGTH] + "..."
     return text
 
-def calculate_suggested_focus_time(due_date: Optional[str], effort_tag: Optional[str]) -> Optional[datetime]:
-    if not due_date or not effort_tag:
-        return None
-    
-    effort_hours = {"small": 1, "medium": 3, "large": 6}
-    hours = effort_hours.get(effort_tag, 3)
-    
-    due = datetime.fromisoformat(due_date)
-    suggested = due - timedelta(hours=hours)
-    return suggested
+def encode_task_cursor(created_at: datetime, task_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-def create_notification(db: Session, user_id: int, message: str, task_id: Optional[int] = None):
-    notif = Notification(user_id=user_id, message=message, task_id=task_id)
-    db.add(notif)
-    db.commit()
+def decode_task_cursor(cursor: str):
+    try:
+        created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(task_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 def check_approval_workflow(task: Task) -> str:
     if task.story_points and task.story_points > 8:
@@ -271,46 +421,6 @@ def check_approval_workflow(task: Task) -> str:
         return "Manager Approval Pending"
     return "To Do"
 
-def extract_tasks_from_text(db: Session, text: str, meeting_id: int) -> List[Task]:
-    tasks = []
-    ai_tasks = extract_tasks_from_transcript(text)
-    
-    for task_data in ai_tasks:
-        assignee_name = task_data.get("assignee", "unassigned")
-        assignee = find_user_by_username(db, assignee_name)
-        if not assignee:
-            assignee = get_or_create_user(db, assignee_name, DEFAULT_PASSWORD, False)
-        
-        confidence = task_data.get("confidence", 1.0)
-        priority = task_data.get("priority", 5)
-        needs_review = False
-        
-        if confidence < 0.7:
-            priority = 4
-            needs_review = True
-        
-        task = Task(
-            description=task_data.get("description", "Follow up"),
-            due_date=task_data.get("due_date"),
-            status="To Do",
-            meeting_id=meeting_id,
-            assignee_id=assignee.id,
-            priority=priority,
-            effort_tag=task_data.get("effort_tag"),
-            confidence=confidence,
-            is_approved=False,
-            is_potential_risk=task_data.get("is_potential_risk", False),
-            risk_reason=task_data.get("risk_reason"),
-            needs_priority_review=needs_review,
-            suggested_focus_time=calculate_suggested_focus_time(task_data.get("due_date"), task_data.get("effort_tag"))
-        )
-        db.add(task)
-        db.commit()
-        db.refresh(task)
-        tasks.append(task)
-    
-    return tasks
-
 
 # Auth endpoints
 @app.post("/auth/login", response_model=LoginResponse)
@@ -319,16 +429,21 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     if not user or user.password != request.password:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    token_str = create_token_for_user(db, user)
+    token_str = issue_token(db, user)
     return LoginResponse(
         token=token_str,
         username=user.username,
         is_admin=user.is_admin
     )
 
+@app.post("/auth/logout")
+def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    revoke_token(db, token)
+    return {"status": "logged out"}
+
 @app.post("/auth/register", response_model=UserOut)
 def register(request: RegisterRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.username == request.username).first()
+    existing = db.query(User.id).filter(User.username_normalized == normalize_username(request.username)).first()
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
     
@@ -342,60 +457,115 @@ async def process_meeting(
     date: Optional[str] = Form(None),
     transcript: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
+    background: bool = Form(False),
+    bypass_cache: bool = Form(False),
+    transcriber: Optional[str] = Form(None),
     current_user: User = Depends(admin_required),
     db: Session = Depends(get_db),
 ):
     if not transcript and not file:
         raise HTTPException(status_code=400, detail="Provide transcript or audio file")
+    if transcriber and transcriber not in TRANSCRIPTION_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"transcriber must be one of: {', '.join(TRANSCRIPTION_BACKENDS)}")
     
     effective_text = transcript or ""
+    audio = None
     if file and not transcript:
+        # Streamed to the blob store in chunks; the recording is never held in memory
         try:
-            await file.read()
-            effective_text = f"[Audio uploaded: {file.filename} — transcription not enabled]"
-        except Exception:
+            stored = await run_in_threadpool(audio_store.save, file.file, file.filename)
+            audio = {"sha256": stored.sha256, "filename": stored.filename, "transcriber": transcriber}
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except OSError:
             effective_text = "[Audio uploaded — processing failed]"
+        finally:
+            await file.close()
     
-    summary = generate_meeting_summary(effective_text) if effective_text else "No summary"
     meeting_date = date or datetime.utcnow().isoformat()
     
-    meeting = Meeting(
-        title=title,
-        date=meeting_date,
-        summary_minutes=summary,
-        processed_by_id=current_user.id
-    )
-    db.add(meeting)
-    db.commit()
-    db.refresh(meeting)
+    # Background mode answers 202 right away; a worker transcribes and fills in the summary and tasks
+    if background and (effective_text or audio):
+        job = await run_in_threadpool(enqueue_meeting_processing, db, title, meeting_date, current_user.id, effective_text, not bypass_cache, audio)
+        return JSONResponse(status_code=202, content={"job_id": job.id, "meeting_id": job.meeting_id, "status": job.status})
+    
+    if audio:
+        effective_text = await run_in_threadpool(transcribe_audio, audio["sha256"], audio["filename"], transcriber)
     
+    # Summary and extraction are independent, so latency is the slower of the two
     if effective_text:
-        extract_tasks_from_text(db, effective_text, meeting.id)
+        summary, ai_tasks = await asyncio.gather(
+            run_llm(generate_meeting_summary, effective_text, not bypass_cache),
+            run_llm(extract_tasks_from_transcript, effective_text, not bypass_cache),
+        )
+    else:
+        summary, ai_tasks = "No summary", []
     
-    return meeting
-
-
-@app.get("/meetings", response_model=List[MeetingOut])
-def list_meetings(current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    return db.query(Meeting).order_by(Meeting.created_at.desc()).all()
-
-@app.get("/tasks", response_model=List[TaskOut])
-def list_tasks(current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    tasks = db.query(Task).order_by(Task.created_at.desc()).all()
-    for task in tasks:
-        if task.submitted_at:
-            task.submitted_at = task.submitted_at.isoformat()
-        if task.verified_at:
-            task.verified_at = task.verified_at.isoformat()
-        if task.suggested_focus_time:
-            task.suggested_focus_time = task.suggested_focus_time.isoformat()
-        if task.verification_deadline_at:
-            task.verification_deadline_at = task.verification_deadline_at.isoformat()
-    return tasks
-
-@app.get("/tasks/my", response_model=List[TaskOut])
-def my_tasks(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Task).filter(Task.assignee_id == current_user.id).order_by(Task.created_at.desc()).all()
+    return await run_in_threadpool(save_processed_meeting, db, title, meeting_date, summary, current_user.id, ai_tasks, audio)
+
+
+@app.get("/jobs/{job_id}", response_model=JobOut)
+def get_job(job_id: int, current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/meetings", response_model=List[MeetingFields])
+def list_meetings(
+    current_user: User = Depends(admin_required),
+    fields: Tuple[str, ...] = Depends(sparse_fields(MEETING_OUT_FIELDS)),
+    db: Session = Depends(get_db),
+):
+    rows = db.query(*entity_columns(Meeting, fields)).order_by(Meeting.created_at.desc()).all()
+    return rows_response(rows, fields)
+
+@app.get("/tasks", response_model=List[TaskFields])
+def list_tasks(
+    status: Optional[str] = None,
+    assignee_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    workcycle_id: Optional[int] = None,
+    bundle_id: Optional[int] = None,
+    is_approved: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(admin_required),
+    fields: Tuple[str, ...] = Depends(task_fields),
+    etag: CollectionETag = Depends(conditional("tasks", per_user=False)),
+    db: Session = Depends(get_db),
+):
+    not_modified = etag.not_modified()
+    if not_modified:
+        return not_modified
+    # created_at rides along after the selected columns for the cursor; rows_response drops it
+    query = task_list_query(db.query(*task_columns(fields), Task.created_at), status, assignee_id, team_id, workcycle_id, bundle_id, is_approved)
+    if cursor:
+        created_at, task_id = decode_task_cursor(cursor)
+        query = query.filter(or_(
+            Task.created_at < created_at,
+            and_(Task.created_at == created_at, Task.id < task_id),
+        ))
+    
+    # Without a limit the full list is returned, as older clients expect
+    headers = dict(etag.headers)
+    if limit is None:
+        rows = query.all()
+    else:
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_task_cursor(rows[-1].created_at, rows[-1].id)
+    return rows_response(rows, fields, headers=headers)
+
+@app.get("/tasks/my", response_model=List[TaskFields])
+def my_tasks(current_user: User = Depends(get_current_user), fields: Tuple[str, ...] = Depends(task_fields), etag: CollectionETag = Depends(conditional("tasks")), db: Session = Depends(get_db)):
+    not_modified = etag.not_modified()
+    if not_modified:
+        return not_modified
+    rows = my_tasks_query(db.query(*task_columns(fields)), current_user.id).all()
+    return rows_response(rows, fields, headers=etag.headers)
 
 @app.post("/tasks", response_model=TaskOut, status_code=201)
 def create_task(
@@ -407,21 +577,18 @@ def create_task(
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    assignee = find_user_by_username(db, request.assignee_username)
-    if not assignee:
-        assignee = get_or_create_user(db, request.assignee_username, DEFAULT_PASSWORD, False)
+    assignee_id = resolve_assignees(db, [request.assignee_username])[request.assignee_username]
     
     task = Task(
         description=request.description,
         due_date=request.due_date,
         status="To Do",
         meeting_id=meeting.id,
-        assignee_id=assignee.id
+        assignee_id=assignee_id
     )
     db.add(task)
     db.commit()
-    db.refresh(task)
-    return task
+    return task_response(db, task.id)
 
 @app.post("/tasks/{task_id}/complete", response_model=TaskOut)
 def complete_task(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -435,19 +602,42 @@ def complete_task(task_id: int, current_user: User = Depends(get_current_user),
     task.status = "Done"
     db.add(task)
     db.commit()
-    db.refresh(task)
-    return task
+    return task_response(db, task_id)
 
 # Priority Queue endpoints
-@app.get("/tasks/queue", response_model=List[TaskOut])
-def priority_queue(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Task).filter(Task.is_approved == True, Task.workcycle_id == None).order_by(Task.priority.desc(), Task.created_at.desc()).all()
-
-
-@app.get("/tasks/review", response_model=List[TaskOut])
-def review_queue(current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    return db.query(Task).filter(Task.is_approved == False).order_by(Task.confidence.desc(), Task.created_at.desc()).all()
-
+@app.get("/tasks/queue", response_model=List[TaskFields])
+def priority_queue(current_user: User = Depends(get_current_user), fields: Tuple[str, ...] = Depends(task_fields), etag: CollectionETag = Depends(conditional("tasks", per_user=False)), db: Session = Depends(get_db)):
+    not_modified = etag.not_modified()
+    if not_modified:
+        return not_modified
+    rows = priority_queue_query(db.query(*task_columns(fields))).all()
+    return rows_response(rows, fields, headers=etag.headers)
+
+
+@app.get("/tasks/review", response_model=List[TaskFields])
+def review_queue(current_user: User = Depends(admin_required), fields: Tuple[str, ...] = Depends(task_fields), db: Session = Depends(get_db)):
+    rows = review_queue_query(db.query(*task_columns(fields))).all()
+    return rows_response(rows, fields)
+
+
+@app.patch("/tasks/bulk")
+def bulk_update_tasks_endpoint(request: TaskBulkUpdateRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if len(request.updates) + len(request.sprint_order or []) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request")
+    diffs = {}
+    for item in request.updates:
+        # Later entries for the same id win, field by field
+        diffs.setdefault(item.id, {}).update(item.dict(exclude={"id"}, exclude_none=True))
+    found = set(bulk_update_tasks(db, diffs, request.sprint_order))
+
+    touched = list(dict.fromkeys([*diffs, *(request.sprint_order or [])]))
+    rows = {row.id: row for row in db.query(*TASK_OUT_COLUMNS).filter(Task.id.in_(found))} if found else {}
+    results = [
+        {"id": task_id, "status": "updated", "task": dict(zip(TASK_OUT_FIELDS, rows[task_id]))}
+        if task_id in found else {"id": task_id, "status": "not_found", "task": None}
+        for task_id in touched
+    ]
+    return FastJSONResponse({"updated": len(found), "results": results})
 
 @app.patch("/tasks/{task_id}", response_model=TaskOut)
 def update_task(task_id: int, request: TaskUpdateRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -483,66 +673,34 @@ def update_task(task_id: int, request: TaskUpdateRequest, current_user: User = D
         task.definition_of_done = request.definition_of_done
     
     db.commit()
-    db.refresh(task)
-    return task
+    return task_response(db, task_id)
+
+def task_response(db: Session, task_id: int) -> dict:
+    # A plain dict, not a Response, so the route's status_code and TaskOut validation still apply
+    row = db.query(*TASK_OUT_COLUMNS).filter(Task.id == task_id).one()
+    return dict(zip(TASK_OUT_FIELDS, row))
 
 @app.post("/tasks/{task_id}/submit", response_model=TaskOut)
 def submit_task(task_id: int, request: TaskSubmissionRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    if task.assignee_id != current_user.id:
+    if not submit_for_review(db, task_id, current_user.id, request.submission_notes, request.submission_url):
+        # Nothing matched; work out why only on this path
+        if not db.query(Task.id).filter(Task.id == task_id).first():
+            raise HTTPException(status_code=404, detail="Task not found")
         raise HTTPException(status_code=403, detail="Only assignee can submit")
-    
-    task.submitted_at = datetime.utcnow()
-    task.submission_notes = request.submission_notes
-    task.submission_url = request.submission_url
-    task.status = "Submitted"
-    task.progress = 100
-    task.verification_deadline_at = datetime.utcnow() + timedelta(hours=24)
-    
-    create_notification(db, task.assignee_id, f"Task submitted for review: {task.description}", task.id)
-    
-    db.commit()
-    db.refresh(task)
-    return task
+    return task_response(db, task_id)
 
 @app.post("/tasks/{task_id}/verify", response_model=TaskOut)
 def verify_task(task_id: int, request: TaskVerificationRequest, current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    if not task.submitted_at:
+    if not record_verification(db, task_id, current_user.id, request.approved, request.verification_notes):
+        if not db.query(Task.id).filter(Task.id == task_id).first():
+            raise HTTPException(status_code=404, detail="Task not found")
         raise HTTPException(status_code=400, detail="Task not submitted yet")
-    
-    task.verified_at = datetime.utcnow()
-    task.verified_by_id = current_user.id
-    task.verification_notes = request.verification_notes
-    
-    if request.approved:
-        task.status = "Done"
-        create_notification(db, task.assignee_id, f"Task approved: {task.description}", task.id)
-    else:
-        task.status = "Doing"
-        task.submitted_at = None
-        task.progress = 50
-        create_notification(db, task.assignee_id, f"Task rejected: {task.description}. Feedback: {request.verification_notes}", task.id)
-    
-    db.commit()
-    db.refresh(task)
-    return task
+    return task_response(db, task_id)
 
-@app.get("/tasks/pending-verification", response_model=List[TaskOut])
-def pending_verification(current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    tasks = db.query(Task).filter(Task.status == "Submitted", Task.verified_at == None).order_by(Task.submitted_at.desc()).all()
-    for task in tasks:
-        if task.submitted_at:
-            task.submitted_at = task.submitted_at.isoformat()
-        if task.verification_deadline_at:
-            task.verification_deadline_at = task.verification_deadline_at.isoformat()
-    return tasks
+@app.get("/tasks/pending-verification", response_model=List[TaskFields])
+def pending_verification(current_user: User = Depends(admin_required), fields: Tuple[str, ...] = Depends(task_fields), db: Session = Depends(get_db)):
+    rows = pending_verification_query(db.query(*task_columns(fields))).all()
+    return rows_response(rows, fields)
 
 
 # Work Cycle endpoints
@@ -562,13 +720,17 @@ def create_workcycle(request: WorkCycleRequest, current_user: User = Depends(adm
 
 
 @app.get("/workcycles", response_model=List[WorkCycleOut])
-def list_workcycles(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_workcycles(current_user: User = Depends(get_current_user), etag: CollectionETag = Depends(conditional("work_cycles", per_user=False)), db: Session = Depends(get_db)):
+    not_modified = etag.not_modified()
+    if not_modified:
+        return not_modified
     return db.query(WorkCycle).order_by(WorkCycle.created_at.desc()).all()
 
 
-@app.get("/workcycles/{cycle_id}/tasks", response_model=List[TaskOut])
-def workcycle_tasks(cycle_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Task).filter(Task.workcycle_id == cycle_id).order_by(Task.priority.desc()).all()
+@app.get("/workcycles/{cycle_id}/tasks", response_model=List[TaskFields])
+def workcycle_tasks(cycle_id: int, current_user: User = Depends(get_current_user), fields: Tuple[str, ...] = Depends(task_fields), db: Session = Depends(get_db)):
+    rows = workcycle_tasks_query(db.query(*task_columns(fields)), cycle_id).all()
+    return rows_response(rows, fields)
 
 
 @app.get("/workcycles/{cycle_id}/snapshot")
@@ -576,27 +738,14 @@ def workcycle_snapshot(cycle_id: int, current_user: User = Depends(get_current_u
     cycle = db.query(WorkCycle).filter(WorkCycle.id == cycle_id).first()
     if not cycle:
         raise HTTPException(status_code=404, detail="Work cycle not found")
-    
-    tasks = db.query(Task).filter(Task.workcycle_id == cycle_id).all()
-    
-    effort_map = {"small": 1, "medium": 3, "large": 5}
-    total_effort = sum(effort_map.get(t.effort_tag, 0) for t in tasks)
-    remaining_effort = sum(effort_map.get(t.effort_tag, 0) for t in tasks if t.status != "Done")
-    
-    blockers = [t for t in tasks if "block" in t.description.lower() or "stuck" in t.description.lower()]
-    doing = [t for t in tasks if t.status == "Doing"]
-    upcoming = [t for t in tasks if t.due_date and t.status not in ["Done", "Doing"]]
-    
-    return {
-        "cycle_name": cycle.name,
-        "total_items": len(tasks),
-        "completed_items": len([t for t in tasks if t.status == "Done"]),
-        "total_effort": total_effort,
-        "remaining_effort": remaining_effort,
-        "blockers": [{"id": t.id, "description": t.description} for t in blockers[:3]],
-        "doing": [{"id": t.id, "description": t.description} for t in doing[:3]],
-        "upcoming": [{"id": t.id, "due_date": t.due_date} for t in upcoming[:3]]
-    }
+    return get_workcycle_snapshot(db, cycle)
+
+@app.get("/workcycles/{cycle_id}/burndown", response_model=BurndownOut)
+def workcycle_burndown(cycle_id: int, start: Optional[str] = None, end: Optional[str] = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    cycle = db.query(WorkCycle).filter(WorkCycle.id == cycle_id).first()
+    if not cycle:
+        raise HTTPException(status_code=404, detail="Work cycle not found")
+    return get_burndown(db, cycle, start, end)
 
 
 # Bundle Group endpoints
@@ -614,31 +763,58 @@ def create_bundle(request: BundleGroupRequest, current_user: User = Depends(admi
 
 
 @app.get("/bundles", response_model=List[BundleGroupOut])
-def list_bundles(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_bundles(current_user: User = Depends(get_current_user), etag: CollectionETag = Depends(conditional("bundle_groups", per_user=False)), db: Session = Depends(get_db)):
+    not_modified = etag.not_modified()
+    if not_modified:
+        return not_modified
     return db.query(BundleGroup).order_by(BundleGroup.created_at.desc()).all()
 
 
-@app.get("/bundles/{bundle_id}/tasks", response_model=List[TaskOut])
-def bundle_tasks(bundle_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Task).filter(Task.bundle_id == bundle_id).all()
+@app.get("/bundles/{bundle_id}/tasks", response_model=List[TaskFields])
+def bundle_tasks(bundle_id: int, current_user: User = Depends(get_current_user), fields: Tuple[str, ...] = Depends(task_fields), db: Session = Depends(get_db)):
+    rows = bundle_tasks_query(db.query(*task_columns(fields)), bundle_id).all()
+    return rows_response(rows, fields)
+
 
+def briefing_conditional(request: Request, response: Response, current_user: User = Depends(get_current_user)) -> CollectionETag:
+    # Also changes with the day and every BRIEFING_CACHE_SECONDS, since SLA counts depend on the clock
+    now = time.time()
+    parts = [datetime.utcnow().date(), int(now // BRIEFING_CACHE_SECONDS) if BRIEFING_CACHE_SECONDS > 0 else now]
+    check = CollectionETag(["tasks"], parts, request.headers.get("If-None-Match"))
+    response.headers.update(check.headers)
+    return check
 
 @app.get("/analytics/briefing")
-def daily_briefing(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def daily_briefing(current_user: User = Depends(get_current_user), etag: CollectionETag = Depends(briefing_conditional), db: Session = Depends(get_db)):
+    not_modified = etag.not_modified()
+    if not_modified:
+        return not_modified
     return get_daily_briefing(db)
 
 @app.get("/analytics/productivity")
-def productivity_analytics(days: int = 7, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return get_productivity_analytics(db, days)
+def productivity_analytics(days: int = 7, team_id: Optional[int] = None, assignee_id: Optional[int] = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_productivity_analytics(db, days, team_id, assignee_id)
+
+@app.get("/search")
+def search_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(admin_required),
+    db: Session = Depends(get_db),
+):
+    if kind is not None and kind not in SEARCH_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(SEARCH_KINDS)}")
+    return search(db, q, [kind] if kind else list(SEARCH_KINDS), limit, offset)
 
 @app.post("/tasks/capture", response_model=TaskOut, status_code=201)
 def capture_task(request: TaskCaptureRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    extracted = extract_task_from_capture(request.text)
+    extracted = extract_task_from_capture(request.text, not request.bypass_cache)
     
     assignee_name = extracted.get("assignee", "unassigned")
-    assignee = find_user_by_username(db, assignee_name)
-    if not assignee:
-        assignee = current_user
+    # Never creates users: an unrecognised name lands in the capturer's own inbox
+    assignee_id = user_directory.match(db, assignee_name) or current_user.id
     
     meeting = db.query(Meeting).first()
     if not meeting:
@@ -651,48 +827,27 @@ def capture_task(request: TaskCaptureRequest, current_user: User = Depends(get_c
         description=extracted.get("description", request.text[:200]),
         status="Capture Inbox",
         meeting_id=meeting.id,
-        assignee_id=assignee.id,
+        assignee_id=assignee_id,
         priority=5,
         is_approved=False
     )
     db.add(task)
     db.commit()
-    db.refresh(task)
-    return task
+    return task_response(db, task.id)
 
 @app.post("/tasks/{task_id}/approve-manager", response_model=TaskOut)
 def approve_manager(task_id: int, current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    if task.status != "Manager Approval Pending":
+    if not approve_by_manager(db, [task_id]):
+        if not db.query(Task.id).filter(Task.id == task_id).first():
+            raise HTTPException(status_code=404, detail="Task not found")
         raise HTTPException(status_code=400, detail="Task not pending approval")
-    
-    task.status = "To Do"
-    task.is_approved = True
-    create_notification(db, task.assignee_id, f"Task approved by manager: {task.description}", task.id)
-    
-    db.commit()
-    db.refresh(task)
-    return task
-
-@app.get("/tasks/sla-breached", response_model=List[TaskOut])
-def sla_breached_tasks(current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
-    now = datetime.utcnow()
-    tasks = db.query(Task).filter(
-        Task.status == "Submitted",
-        Task.verification_deadline_at < now,
-        Task.verified_at == None
-    ).all()
-    
-    for task in tasks:
-        if not task.sla_breached:
-            task.sla_breached = True
-            create_notification(db, task.assignee_id, f"SLA breach: Task verification overdue - {task.description}", task.id)
-    
-    db.commit()
-    return tasks
+    return task_response(db, task_id)
+
+@app.get("/tasks/sla-breached", response_model=List[TaskFields])
+def sla_breached_tasks(current_user: User = Depends(admin_required), fields: Tuple[str, ...] = Depends(task_fields), db: Session = Depends(get_db)):
+    # Read-only: flagging and notifying happen in the scan_sla_breaches background job
+    rows = sla_breached_query(db.query(*task_columns(fields)), datetime.utcnow()).all()
+    return rows_response(rows, fields)
 
 @app.post("/teams", status_code=201)
 def create_team(request: TeamRequest, current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
@@ -711,7 +866,79 @@ def add_team_member(team_id: int, user_id: int, current_user: User = Depends(adm
 
 @app.get("/notifications")
 def get_notifications(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).limit(50).all()
+    return notifications_query(db.query(Notification), current_user.id).all()
+
+NOTIFY_REPLAY_LIMIT = 50
+SSE_RETRY_MS = 5000
+
+def load_missed_notifications(user_id: int, after_id: int) -> List[dict]:
+    with SessionLocal() as db:
+        missed = db.query(Notification).filter(Notification.user_id == user_id, Notification.id > after_id).order_by(Notification.id.desc()).limit(NOTIFY_REPLAY_LIMIT).all()
+        return [notification_payload(n) for n in reversed(missed)]
+
+def authenticate_stream(ticket: Optional[str], token: Optional[str]) -> int:
+    # Own short-lived session: a request-scoped one would stay checked out for the life of the stream
+    with SessionLocal() as db:
+        if ticket is None:
+            return get_current_user(token, db).id
+        user_id = redeem_stream_ticket(db, ticket)
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+        return user_id
+
+def sse_event(payload: dict) -> bytes:
+    return b"id: %d\nevent: notification\ndata: %s\n\n" % (payload["id"], dumps(payload))
+
+@app.post("/notifications/stream-ticket")
+def create_stream_ticket(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return {"ticket": issue_stream_ticket(db, current_user.id), "expires_in": STREAM_TICKET_SECONDS}
+
+@app.get("/notifications/stream")
+async def notification_stream(request: Request, ticket: Optional[str] = None, last_id: Optional[int] = None):
+    # EventSource cannot set headers, so browsers pass a single-use ticket; the bearer token never goes in the URL
+    scheme, _, value = request.headers.get("Authorization", "").partition(" ")
+    token = value if scheme.lower() == "bearer" else None
+    user_id = await run_in_threadpool(authenticate_stream, ticket, token)
+
+    subscription = notification_hub.subscribe(user_id)
+    if subscription is None:
+        raise HTTPException(status_code=429, detail="Too many open notification streams")
+    # Subscribe first, then replay from the database, so nothing committed in between is lost
+    last_event_id = request.headers.get("Last-Event-ID")
+    after_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else last_id
+    try:
+        missed = await run_in_threadpool(load_missed_notifications, user_id, after_id) if after_id is not None else []
+    except Exception:
+        notification_hub.unsubscribe(subscription)
+        raise
+
+    async def events():
+        sent_id = after_id or 0
+        try:
+            yield b"retry: %d\n\n" % SSE_RETRY_MS
+            for payload in missed:
+                sent_id = payload["id"]
+                yield sse_event(payload)
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscription.queue.get(), NOTIFY_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from timing out the idle connection
+                    yield b": ping\n\n"
+                    continue
+                if payload is CLOSED:
+                    # Queue overflowed or the server is stopping; the client reloads and reconnects
+                    yield b"event: resync\ndata: {}\n\n"
+                    break
+                if payload["id"] <= sent_id:
+                    continue
+                sent_id = payload["id"]
+                yield sse_event(payload)
+        finally:
+            notification_hub.unsubscribe(subscription)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
 
 @app.patch("/notifications/{notif_id}/read")
 def mark_notification_read(notif_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -723,21 +950,16 @@ def mark_notification_read(notif_id: int, current_user: User = Depends(get_curre
 
 @app.post("/tasks/plan-tomorrow")
 def plan_tomorrow(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    tasks = db.query(Task).filter(
-        Task.assignee_id == current_user.id,
-        Task.status.in_(["To Do", "Doing"]),
-        Task.progress < 100
-    ).all()
-    
-    tomorrow = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
-    
-    for task in tasks:
-        task.status = "Planned for Tomorrow"
-        if not task.due_date or task.due_date < tomorrow:
-            task.due_date = tomorrow
-    
-    db.commit()
-    return {"count": len(tasks), "status": "planned"}
+    return {"count": plan_tomorrow_for_user(db, current_user.id), "status": "planned"}
+
+@app.post("/teams/plan-tomorrow")
+def plan_tomorrow_for_everyone(team_id: Optional[int] = None, current_user: User = Depends(admin_required), db: Session = Depends(get_db)):
+    # End-of-day batch: every member of team_id, or everyone when omitted
+    return {"count": plan_tomorrow_for_team(db, team_id), "status": "planned"}
+
+@app.get("/admin/metrics")
+def admin_metrics(current_user: User = Depends(admin_required)):
+    return {"auth_cache": token_cache.stats(), "llm_cache": llm_cache.stats(), "jobs": scheduler.stats(), "notifications": notification_hub.stats(), "user_directory": user_directory.stats()}
 
 @app.get("/health")
 def health():
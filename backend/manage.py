@@ -0,0 +1,81 @@
+"""Maintenance commands. Run from backend/:  python manage.py <command>"""
+import sys
+import argparse
+
+from sqlalchemy import text
+
+from database import SessionLocal, Base, engine, rebuild_task_rollup, rebuild_search_index, search_enabled
+from migrations import run_migrations
+from workflow_service import plan_tomorrow_for_team
+
+
+def cmd_rebuild_rollup(args) -> None:
+    with SessionLocal() as db:
+        rows = rebuild_task_rollup(db)
+    print(f"Rebuilt task_daily_rollup: {rows} rows")
+
+
+def cmd_rebuild_search(args) -> None:
+    if not search_enabled():
+        print("Full-text search needs SQLite with FTS5; nothing to rebuild")
+        return
+    with SessionLocal() as db:
+        rows = rebuild_search_index(db)
+    print(f"Rebuilt search index: {rows} tasks and meetings")
+
+
+def cmd_plan_tomorrow(args) -> None:
+    with SessionLocal() as db:
+        count = plan_tomorrow_for_team(db, args.team)
+    print(f"Planned {count} open task(s) for tomorrow")
+
+
+def cmd_migrate(args) -> None:
+    # Importing database already ran init_db, so this normally only reports what is recorded
+    run_migrations(engine, Base.metadata)
+    with engine.connect() as conn:
+        for version, name, applied_at in conn.execute(text("SELECT version, name, applied_at FROM schema_migrations ORDER BY version")):
+            print(f"{version:3}  {applied_at}  {name}")
+
+
+def cmd_check_indexes(args) -> None:
+    if engine.dialect.name != "sqlite":
+        print("check-indexes reads SQLite query plans; skipping for", engine.dialect.name)
+        return
+    from query_plans import check_query_plans
+
+    with SessionLocal() as db:
+        results = check_query_plans(db)
+    failed = 0
+    for name, result in results.items():
+        status = "FAIL" if result["failures"] else ("WARN" if result["warnings"] else "ok")
+        failed += bool(result["failures"])
+        print(f"{status:4}  {name}")
+        if status != "ok" or args.verbose:
+            for step in result["plan"]:
+                print(f"        {step}")
+    print(f"{len(results) - failed}/{len(results)} queries use an index")
+    if failed:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("rebuild-rollup", help="Recompute task_daily_rollup from the tasks table").set_defaults(func=cmd_rebuild_rollup)
+    commands.add_parser("rebuild-search", help="Reindex tasks and meetings for /search").set_defaults(func=cmd_rebuild_search)
+    plan = commands.add_parser("plan-tomorrow", help="End-of-day batch: move open tasks to 'Planned for Tomorrow'")
+    plan.add_argument("--team", type=int, help="Only members of this team (default: everyone)")
+    plan.set_defaults(func=cmd_plan_tomorrow)
+    commands.add_parser("migrate", help="Apply pending schema migrations and list the applied ones").set_defaults(func=cmd_migrate)
+    check = commands.add_parser("check-indexes", help="EXPLAIN the hot task queries and fail if any scans a table")
+    check.add_argument("--verbose", action="store_true", help="Print every plan, not just problems")
+    check.set_defaults(func=cmd_check_indexes)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Ordered schema migrations for databases created by older versions of the app.
+
+create_all only adds missing tables, so anything that changes an existing table (new indexes,
+dropped indexes) is listed here. Each step runs once and is recorded in schema_migrations.
+Steps must also be safe on a fresh database, where create_all has already built the final schema.
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple, Iterable
+
+from sqlalchemy import text, inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import MetaData
+
+
+def create_indexes(conn: Connection, metadata: MetaData, names: Iterable[str]) -> None:
+    wanted = set(names)
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in wanted:
+                index.create(bind=conn, checkfirst=True)
+
+
+def drop_indexes(conn: Connection, names: Iterable[str]) -> None:
+    for name in names:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _task_list_indexes(conn: Connection, metadata: MetaData) -> None:
+    create_indexes(conn, metadata, [
+        "ix_tasks_created_at_id",
+        "ix_tasks_status_created_at",
+        "ix_tasks_assignee_created_at",
+        "ix_tasks_approved_created_at",
+        "ix_tasks_team_id",
+        "ix_tasks_bundle_id",
+        "ix_jobs_status_id",
+    ])
+
+
+def _task_query_indexes(conn: Connection, metadata: MetaData) -> None:
+    create_indexes(conn, metadata, [
+        "ix_tasks_queue",
+        "ix_tasks_review",
+        "ix_tasks_workcycle_priority",
+        "ix_tasks_verification_deadline",
+        "ix_tasks_pending_verification",
+        "ix_notifications_user_created",
+    ])
+    # Leading column of ix_tasks_workcycle_priority
+    drop_indexes(conn, ["ix_tasks_workcycle_id"])
+
+
+def _sla_scan_index(conn: Connection, metadata: MetaData) -> None:
+    create_indexes(conn, metadata, ["ix_tasks_sla_scan"])
+
+
+def _snapshot_index(conn: Connection, metadata: MetaData) -> None:
+    create_indexes(conn, metadata, ["ux_progress_snapshots_cycle_date"])
+
+
+def _normalized_usernames(conn: Connection, metadata: MetaData) -> None:
+    # Imported here: database imports this module and runs the migrations while it is still loading
+    from database import normalize_username
+
+    if "username_normalized" not in {c["name"] for c in inspect(conn).get_columns("users")}:
+        conn.execute(text("ALTER TABLE users ADD COLUMN username_normalized VARCHAR(128)"))
+    # The oldest account keeps the normalized name; later case-variant duplicates stay NULL and are found by exact username only
+    taken = {row[0] for row in conn.execute(text("SELECT username_normalized FROM users WHERE username_normalized IS NOT NULL"))}
+    updates = []
+    for user_id, username in conn.execute(text("SELECT id, username FROM users WHERE username_normalized IS NULL ORDER BY id")).all():
+        normalized = normalize_username(username)
+        if normalized in taken:
+            continue
+        taken.add(normalized)
+        updates.append({"id": user_id, "n": normalized})
+    if updates:
+        conn.execute(text("UPDATE users SET username_normalized = :n WHERE id = :id"), updates)
+    create_indexes(conn, metadata, ["ux_users_username_normalized"])
+
+
+def _job_heartbeat(conn: Connection, metadata: MetaData) -> None:
+    if "heartbeat_at" not in {c["name"] for c in inspect(conn).get_columns("jobs")}:
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN heartbeat_at TIMESTAMP"))
+
+
+def _partial_task_indexes(conn: Connection, metadata: MetaData) -> None:
+    # Whole-table composites replaced by partial indexes over the slices the hot queries read
+    drop_indexes(conn, [
+        "ix_tasks_approved_created_at",
+        "ix_tasks_queue",
+        "ix_tasks_review",
+        "ix_tasks_verification_deadline",
+        "ix_tasks_sla_scan",
+        "ix_tasks_pending_verification",
+    ])
+    create_indexes(conn, metadata, [
+        "ix_tasks_queue_unplanned",
+        "ix_tasks_review_unapproved",
+        "ix_tasks_awaiting_verification",
+        "ix_tasks_open_assignee",
+    ])
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection, MetaData], None]]] = [
+    (1, "task list indexes", _task_list_indexes),
+    (2, "composite indexes for task query patterns", _task_query_indexes),
+    (3, "index for the background SLA breach scan", _sla_scan_index),
+    (4, "unique daily progress snapshot per work cycle", _snapshot_index),
+    (5, "normalized usernames", _normalized_usernames),
+    (6, "job lease heartbeat", _job_heartbeat),
+    (7, "partial indexes for the hot task queues", _partial_task_indexes),
+]
+
+
+def run_migrations(engine: Engine, metadata: MetaData) -> List[str]:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY, name VARCHAR(256) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+        done = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            step(conn, metadata)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": name, "t": datetime.utcnow()},
+            )
+        applied.append(name)
+    return applied
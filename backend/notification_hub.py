@@ -0,0 +1,145 @@
+import os
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import event
+
+from database import Notification, SessionLocal
+
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "100"))
+NOTIFY_HEARTBEAT_SECONDS = float(os.getenv("NOTIFY_HEARTBEAT_SECONDS", "15"))
+NOTIFY_MAX_STREAMS_PER_USER = int(os.getenv("NOTIFY_MAX_STREAMS_PER_USER", "5"))
+
+# Queued in place of a notification when a stream must end: it fell too far behind, or the server is stopping
+CLOSED = object()
+
+
+def notification_payload(notif: Notification) -> Dict:
+    return {
+        "id": notif.id,
+        "user_id": notif.user_id,
+        "message": notif.message,
+        "task_id": notif.task_id,
+        "is_read": notif.is_read,
+        "created_at": notif.created_at,
+    }
+
+
+class Subscription:
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+
+class NotificationHub:
+    """Fans committed notifications out to the open streams of their recipients, one bounded queue per stream.
+
+    A stream whose queue fills up is closed rather than allowed to grow; the client reconnects and
+    catches up from the database with Last-Event-ID.
+    """
+
+    def __init__(self, queue_size: int = NOTIFY_QUEUE_SIZE, max_streams_per_user: int = NOTIFY_MAX_STREAMS_PER_USER):
+        self.queue_size = queue_size
+        self.max_streams_per_user = max_streams_per_user
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        # Must be called from the event loop that will read the queue
+        sub = Subscription(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if len(self._subscribers[user_id]) >= self.max_streams_per_user:
+                return None
+            self._subscribers[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            streams = self._subscribers.get(sub.user_id)
+            if streams is not None:
+                streams.discard(sub)
+                if not streams:
+                    del self._subscribers[sub.user_id]
+
+    def publish(self, payloads: List[Dict]) -> None:
+        # Safe from any thread: delivery is handed to each subscriber's own loop
+        with self._lock:
+            targets = [(sub, payload) for payload in payloads for sub in self._subscribers.get(payload["user_id"], ())]
+            self.published += len(payloads)
+        for sub, payload in targets:
+            self._call(sub, self._offer, sub, payload)
+
+    def close_all(self) -> None:
+        with self._lock:
+            subs = [sub for streams in self._subscribers.values() for sub in streams]
+        for sub in subs:
+            self._call(sub, self._close, sub)
+
+    def _call(self, sub: Subscription, func, *args) -> None:
+        try:
+            sub.loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            # The loop is already closed; nobody is reading this queue any more
+            self.unsubscribe(sub)
+
+    def _offer(self, sub: Subscription, payload: Dict) -> None:
+        if sub.closed:
+            return
+        try:
+            sub.queue.put_nowait(payload)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            self.overflows += 1
+            self._close(sub)
+
+    def _close(self, sub: Subscription) -> None:
+        if sub.closed:
+            return
+        sub.closed = True
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(CLOSED)
+
+    def publish_on_commit(self, session, notifications: List[Notification]) -> None:
+        # For rows written with bulk INSERT ... RETURNING, which never show up in session.new
+        session.info.setdefault("new_notifications", []).extend(notification_payload(n) for n in notifications)
+
+    def install(self, session_factory) -> None:
+        @event.listens_for(session_factory, "after_flush")
+        def _collect(session, flush_context):
+            created = [notification_payload(obj) for obj in session.new if isinstance(obj, Notification)]
+            if created:
+                session.info.setdefault("new_notifications", []).extend(created)
+
+        @event.listens_for(session_factory, "after_commit")
+        def _publish(session):
+            created = session.info.pop("new_notifications", None)
+            if created:
+                self.publish(created)
+
+        @event.listens_for(session_factory, "after_rollback")
+        def _discard(session):
+            session.info.pop("new_notifications", None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            streams = sum(len(s) for s in self._subscribers.values())
+            users = len(self._subscribers)
+        return {
+            "streams": streams,
+            "users": users,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+notification_hub = NotificationHub()
+notification_hub.install(SessionLocal)
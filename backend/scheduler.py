@@ -0,0 +1,66 @@
+import threading
+from typing import Callable, List
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], None]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.runs = 0
+        self.failures = 0
+        self.last_error = None
+
+    def run_once(self) -> None:
+        try:
+            self.func()
+            self.runs += 1
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Scheduled job {self.name} failed: {e}")
+
+
+class Scheduler:
+    """Runs registered jobs on daemon threads at a fixed interval until stopped."""
+
+    def __init__(self):
+        self.jobs: List[PeriodicJob] = []
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def every(self, interval_seconds: float, name: str) -> Callable:
+        def decorator(func: Callable[[], None]) -> Callable[[], None]:
+            self.jobs.append(PeriodicJob(name, interval_seconds, func))
+            return func
+        return decorator
+
+    def _loop(self, job: PeriodicJob) -> None:
+        while not self._stop.wait(job.interval_seconds):
+            job.run_once()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for job in self.jobs:
+            if job.interval_seconds <= 0:
+                continue
+            thread = threading.Thread(target=self._loop, args=(job,), name=f"job-{job.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def stats(self) -> List[dict]:
+        return [
+            {"name": j.name, "interval_seconds": j.interval_seconds, "runs": j.runs, "failures": j.failures, "last_error": j.last_error}
+            for j in self.jobs
+        ]
+
+
+scheduler = Scheduler()
@@ -0,0 +1,94 @@
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import text, or_, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from database import Task, Meeting, search_enabled
+
+SEARCH_KINDS = ("task", "meeting")
+SNIPPET_OPEN = "**"
+SNIPPET_CLOSE = "**"
+SNIPPET_TOKENS = 12
+SNIPPET_FALLBACK_CHARS = 120
+
+# bm25 column weights, in SEARCH_INDEXES column order: a hit in the description or title outranks one in notes
+TASK_SEARCH_SQL = """
+SELECT 'task' AS kind, t.id AS id, t.description AS title, t.status AS status,
+       snippet(tasks_fts, -1, :open, :close, '...', :tokens) AS snippet,
+       bm25(tasks_fts, 10.0, 3.0, 2.0) AS rank
+FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+WHERE tasks_fts MATCH :match
+"""
+
+MEETING_SEARCH_SQL = """
+SELECT 'meeting' AS kind, m.id AS id, m.title AS title, NULL AS status,
+       snippet(meetings_fts, -1, :open, :close, '...', :tokens) AS snippet,
+       bm25(meetings_fts, 10.0, 2.0) AS rank
+FROM meetings_fts JOIN meetings m ON m.id = meetings_fts.rowid
+WHERE meetings_fts MATCH :match
+"""
+
+
+def build_match_query(q: str) -> Optional[str]:
+    # User text never reaches FTS5 syntax directly: every word is quoted, the last one matches as a prefix
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(db: Session, q: str, kinds: List[str], limit: int, offset: int) -> Dict:
+    match = build_match_query(q)
+    if match is None:
+        return {"query": q, "results": [], "has_more": False}
+    if search_enabled():
+        rows = _fts_search(db, match, kinds, limit + 1, offset)
+    else:
+        rows = _like_search(db, q, kinds, limit + 1, offset)
+    return {
+        "query": q,
+        "results": [dict(row._mapping) for row in rows[:limit]],
+        "has_more": len(rows) > limit,
+    }
+
+
+def _fts_search(db: Session, match: str, kinds: List[str], limit: int, offset: int):
+    parts = []
+    if "task" in kinds:
+        parts.append(TASK_SEARCH_SQL)
+    if "meeting" in kinds:
+        parts.append(MEETING_SEARCH_SQL)
+    sql = " UNION ALL ".join(parts) + " ORDER BY rank, kind, id LIMIT :limit OFFSET :offset"
+    params = {"match": match, "open": SNIPPET_OPEN, "close": SNIPPET_CLOSE, "tokens": SNIPPET_TOKENS, "limit": limit, "offset": offset}
+    return db.execute(text(sql), params).all()
+
+
+def _like_search(db: Session, q: str, kinds: List[str], limit: int, offset: int):
+    # Databases without FTS5 (e.g. PostgreSQL) get unranked substring matching, newest first
+    needle = q.strip().lower()
+    selects = []
+    if "task" in kinds:
+        selects.append(select(
+            literal("task").label("kind"), Task.id.label("id"), Task.description.label("title"), Task.status.label("status"),
+            func.substr(Task.description, 1, SNIPPET_FALLBACK_CHARS).label("snippet"), literal(0.0).label("rank"),
+            Task.created_at.label("created_at"),
+        ).where(or_(
+            func.lower(Task.description).contains(needle, autoescape=True),
+            func.lower(Task.acceptance_criteria).contains(needle, autoescape=True),
+            func.lower(Task.blocker_reason).contains(needle, autoescape=True),
+        )))
+    if "meeting" in kinds:
+        selects.append(select(
+            literal("meeting").label("kind"), Meeting.id.label("id"), Meeting.title.label("title"), literal(None).label("status"),
+            func.substr(func.coalesce(Meeting.summary_minutes, Meeting.title), 1, SNIPPET_FALLBACK_CHARS).label("snippet"),
+            literal(0.0).label("rank"), Meeting.created_at.label("created_at"),
+        ).where(or_(
+            func.lower(Meeting.title).contains(needle, autoescape=True),
+            func.lower(Meeting.summary_minutes).contains(needle, autoescape=True),
+        )))
+    combined = union_all(*selects).subquery()
+    query = select(combined.c.kind, combined.c.id, combined.c.title, combined.c.status, combined.c.snippet, combined.c.rank)
+    return db.execute(query.order_by(combined.c.created_at.desc()).limit(limit).offset(offset)).all()
@@ -1,5 +1,16 @@
+import time
+import random
+import argparse
 from datetime import datetime, timedelta
-from database import SessionLocal, get_or_create_user, Meeting, Task, WorkCycle, BundleGroup, Team, TeamMember, Notification
+from itertools import accumulate, islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import insert, select, func, text
+
+from database import (
+    SessionLocal, engine, init_db, get_or_create_user, normalize_username, rollup_enabled, search_enabled,
+    rebuild_task_rollup, rebuild_search_index, bump_table_versions, refresh_planner_stats, User, Meeting, Task, WorkCycle, BundleGroup, Team, TeamMember, Notification,
+)
 
 def seed_example_data():
     db = SessionLocal()
@@ -178,10 +189,271 @@ def seed_example_data():
     print("- Daily Shutdown: 'Fix responsive layout' marked for tomorrow")
     print("\nLogin as Admin (Admin/admin123) or Priya (Priya/priya123) to see features!")
 
+# --- Synthetic data at production scale ---
+
+SYNTHETIC_COUNTS = {"users": 2000, "teams": 40, "meetings": 20000, "tasks": 100000, "notifications": 300000, "workcycles": 52}
+TASK_STATUS_WEIGHTS = {
+    "Done": 0.55,
+    "To Do": 0.15,
+    "Doing": 0.10,
+    "Submitted": 0.06,
+    "Planned for Tomorrow": 0.04,
+    "Manager Approval Pending": 0.05,
+    "Capture Inbox": 0.05,
+}
+# Triggers that fire per inserted row; dropped for the load and rebuilt in one pass afterwards
+BULK_LOAD_TRIGGERS = [
+    "trg_tasks_rollup_insert", "trg_tasks_fts_insert", "trg_meetings_fts_insert",
+    "trg_tasks_version_insert", "trg_meetings_version_insert", "trg_users_version_insert",
+]
+
+FIRST_NAMES = ["Priya", "Arjun", "Raghav", "Ananya", "Vikram", "Meera", "Rohan", "Kavya", "Aditya", "Sneha",
+               "Karan", "Isha", "Nikhil", "Pooja", "Siddharth", "Neha", "Rahul", "Divya", "Amit", "Tara",
+               "Alex", "Sam", "Jordan", "Maria", "Chen", "Fatima", "Lucas", "Emma", "Omar", "Yuki"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Nair", "Menon", "Singh", "Rao", "Das",
+              "Kumar", "Joshi", "Shah", "Bose", "Kapoor", "Smith", "Garcia", "Wang", "Khan", "Tanaka"]
+TEAM_AREAS = ["Frontend", "Backend", "Platform", "Mobile", "Data", "Payments", "Growth", "Infra", "QA", "Design"]
+MEETING_KINDS = ["Sprint Planning", "Daily Standup", "Retrospective", "Design Review", "Incident Review", "Roadmap Sync"]
+TASK_VERBS = ["Implement", "Fix", "Refactor", "Design", "Review", "Document", "Migrate", "Test", "Optimize", "Investigate"]
+TASK_OBJECTS = ["login flow", "payment webhook", "search index", "user profile API", "notification service", "dashboard charts",
+                "database migration", "CI pipeline", "rate limiter", "export job", "onboarding screens", "audit log"]
+FILLER = "so that the release stays on track and the team can verify it against the agreed acceptance criteria".split()
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _next_id(table) -> int:
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _bulk_insert(model, rows: Iterable[dict], batch_size: int) -> int:
+    # One executemany INSERT per batch, one transaction per batch
+    started, count = time.perf_counter(), 0
+    for batch in _batches(rows, batch_size):
+        with engine.begin() as conn:
+            conn.execute(insert(model.__table__), batch)
+        count += len(batch)
+    print(f"  {model.__tablename__}: {count} rows in {time.perf_counter() - started:.1f}s")
+    return count
+
+
+def _zipf_cum_weights(n: int, skew: float) -> List[float]:
+    # A few heavy users own most of the tasks and notifications, like real teams
+    return list(accumulate(1.0 / (rank + 1) ** skew for rank in range(n)))
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    # "Done=0.5,To Do=0.3,Doing=0.2"
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.rpartition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def finish_bulk_load() -> None:
+    # Restore the triggers, rebuild what they would have maintained, and move server-side sequences past the explicit ids
+    init_db()
+    with SessionLocal() as db:
+        if rollup_enabled():
+            rebuild_task_rollup(db)
+        if search_enabled():
+            rebuild_search_index(db)
+        if engine.dialect.name == "sqlite":
+            # The version insert triggers were dropped too; one bump makes every process drop its cached views
+            bump_table_versions(db.connection())
+            db.commit()
+        if engine.dialect.name == "postgresql":
+            for table in ("users", "teams", "work_cycles", "meetings", "tasks"):
+                db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+            db.commit()
+    # Row counts changed by orders of magnitude; the planner needs fresh statistics to pick the partial indexes
+    refresh_planner_stats()
+
+
+def seed_synthetic_data(
+    users: int = SYNTHETIC_COUNTS["users"],
+    teams: int = SYNTHETIC_COUNTS["teams"],
+    meetings: int = SYNTHETIC_COUNTS["meetings"],
+    tasks: int = SYNTHETIC_COUNTS["tasks"],
+    notifications: int = SYNTHETIC_COUNTS["notifications"],
+    workcycles: int = SYNTHETIC_COUNTS["workcycles"],
+    days: int = 730,
+    status_weights: Optional[Dict[str, float]] = None,
+    skew: float = 1.0,
+    seed: int = 42,
+    batch_size: int = 20000,
+) -> Dict[str, int]:
+    """Append a production-shaped dataset spread over the last `days` days.
+
+    Rows are generated from a fixed seed (timestamps are relative to now) and written with Core
+    executemany INSERTs in batched transactions. Ids are assigned up front so foreign keys need no
+    round trips; per-row rollup and search triggers are dropped during the load and rebuilt after.
+    """
+    if tasks and not (users and meetings):
+        raise ValueError("Tasks need at least one user and one meeting")
+    rng = random.Random(seed)
+    status_weights = status_weights or TASK_STATUS_WEIGHTS
+    statuses, status_cum = list(status_weights), list(accumulate(status_weights.values()))
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=days)
+    started = time.perf_counter()
+    counts = {}
+
+    def at(offset_seconds: float) -> datetime:
+        return min(start + timedelta(seconds=offset_seconds), now)
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            for trigger in BULK_LOAD_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+
+    try:
+        # Users: ~1% admins, unique human-looking names
+        user_base = _next_id(User.__table__)
+        admins = max(1, users // 100)
+
+        with engine.connect() as conn:
+            taken = set(conn.execute(select(User.username_normalized)).scalars())
+
+        def user_rows():
+            for i in range(users):
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                if normalize_username(name) in taken:
+                    name = f"{name} {user_base + i}"
+                taken.add(normalize_username(name))
+                yield {"id": user_base + i, "username": name, "username_normalized": normalize_username(name),
+                       "password": "changeme", "is_admin": i < admins, "created_at": at(rng.uniform(0, 30 * 86400))}
+        counts["users"] = _bulk_insert(User, user_rows(), batch_size)
+        user_cum = _zipf_cum_weights(users, skew)
+        admin_ids = [user_base + i for i in range(admins)]
+
+        # Teams: every user belongs to one; the first member of each team leads it
+        team_base = _next_id(Team.__table__)
+        counts["teams"] = _bulk_insert(Team, (
+            {"id": team_base + i, "name": f"{TEAM_AREAS[i % len(TEAM_AREAS)]} Team {i // len(TEAM_AREAS) + 1}",
+             "description": "Synthetic team", "created_at": start} for i in range(teams)
+        ), batch_size)
+        user_team = [team_base + rng.randrange(teams) for _ in range(users)] if teams else [None] * users
+
+        def member_rows():
+            leads = set()
+            for i, team_id in enumerate(user_team):
+                yield {"team_id": team_id, "user_id": user_base + i, "role": "member" if team_id in leads else "lead", "joined_at": start}
+                leads.add(team_id)
+        counts["team_members"] = _bulk_insert(TeamMember, member_rows(), batch_size) if teams else 0
+
+        # Work cycles tile the whole period back to back
+        cycle_base = _next_id(WorkCycle.__table__)
+        cycle_seconds = days * 86400 / workcycles if workcycles else 0
+        counts["workcycles"] = _bulk_insert(WorkCycle, (
+            {"id": cycle_base + i, "name": f"Sprint {i + 1}", "owner_id": rng.choice(admin_ids), "created_at": at(i * cycle_seconds),
+             "start_date": at(i * cycle_seconds).date().isoformat(), "end_date": at((i + 1) * cycle_seconds - 1).date().isoformat(),
+             "goal": f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)}"} for i in range(workcycles)
+        ), batch_size)
+
+        # Meetings in chronological order, so tasks extracted from them are too
+        meeting_base = _next_id(Meeting.__table__)
+        meeting_times = sorted(rng.uniform(0, days * 86400) for _ in range(meetings))
+        counts["meetings"] = _bulk_insert(Meeting, (
+            {"id": meeting_base + i, "title": f"{rng.choice(MEETING_KINDS)} #{i + 1}", "date": at(offset).isoformat(),
+             "summary_minutes": " ".join(rng.choices(FILLER, k=rng.randint(20, 120))), "processed_by_id": rng.choice(admin_ids),
+             "created_at": at(offset)} for i, offset in enumerate(meeting_times)
+        ), batch_size)
+
+        task_base = _next_id(Task.__table__)
+
+        def task_rows():
+            for i in range(tasks):
+                m = i * meetings // tasks
+                created = at(meeting_times[m] + rng.uniform(0, 3600))
+                status = rng.choices(statuses, cum_weights=status_cum)[0]
+                assignee = rng.choices(range(users), cum_weights=user_cum)[0]
+                submitted = min(created + timedelta(hours=rng.uniform(2, 240)), now) if status in ("Submitted", "Done") else None
+                verified = min(submitted + timedelta(hours=rng.uniform(1, 48)), now) if status == "Done" else None
+                deadline = submitted + timedelta(hours=24) if submitted else None
+                blocked = status in ("To Do", "Doing") and rng.random() < 0.08
+                risky = rng.random() < 0.05
+                confidence = round(rng.uniform(0.5, 1.0), 2)
+                cycle = int((created - start).total_seconds() // cycle_seconds) if workcycles and rng.random() < 0.6 else None
+                yield {
+                    "id": task_base + i,
+                    "description": f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)} " + " ".join(rng.choices(FILLER, k=rng.randint(0, 25))),
+                    "due_date": (created + timedelta(days=rng.randint(1, 30))).date().isoformat(),
+                    "status": status,
+                    "created_at": created,
+                    "last_updated": verified or submitted or created,
+                    "meeting_id": meeting_base + m,
+                    "assignee_id": user_base + assignee,
+                    "team_id": user_team[assignee],
+                    "workcycle_id": cycle_base + min(cycle, workcycles - 1) if cycle is not None else None,
+                    "priority": rng.randint(1, 10),
+                    "effort_tag": rng.choice(["small", "medium", "large"]),
+                    "confidence": confidence,
+                    "needs_priority_review": confidence < 0.7,
+                    "is_approved": status not in ("Manager Approval Pending", "Capture Inbox"),
+                    "progress": 100 if submitted else rng.randint(10, 90) if status == "Doing" else 0,
+                    "story_points": rng.choice([1, 2, 3, 5, 8, 13]),
+                    "sprint_position": 0,
+                    "is_blocked": blocked,
+                    "blocker_reason": "Waiting on review from another team" if blocked else None,
+                    "is_potential_risk": risky,
+                    "risk_reason": "Depends on an external vendor" if risky else None,
+                    "acceptance_criteria": " ".join(rng.choices(FILLER, k=12)) if rng.random() < 0.3 else None,
+                    "submitted_at": submitted,
+                    "submission_notes": "Ready for review" if submitted else None,
+                    "verified_at": verified,
+                    "verified_by_id": rng.choice(admin_ids) if verified else None,
+                    "verification_deadline_at": deadline,
+                    "sla_breached": status == "Submitted" and deadline < now and rng.random() < 0.9,
+                }
+        counts["tasks"] = _bulk_insert(Task, task_rows(), batch_size)
+
+        def notification_rows():
+            for _ in range(notifications):
+                created = at(rng.uniform(0, days * 86400))
+                task_id = task_base + rng.randrange(tasks) if tasks and rng.random() < 0.8 else None
+                yield {
+                    "user_id": user_base + rng.choices(range(users), cum_weights=user_cum)[0],
+                    "message": f"Task update: {rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)}" if task_id else "Reminder: check your Priority Queue",
+                    "task_id": task_id,
+                    "is_read": created < now - timedelta(days=7) or rng.random() < 0.5,
+                    "created_at": created,
+                }
+        counts["notifications"] = _bulk_insert(Notification, notification_rows(), batch_size)
+    finally:
+        # Also on failure: the triggers are gone and the rollup and search index already lag the rows written so far
+        finish_bulk_load()
+    print(f"Synthetic data seeded in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
 if __name__ == "__main__":
     try:
         import sys
         sys.stdout.reconfigure(encoding='utf-8')
     except:
         pass
-    seed_example_data()
+    parser = argparse.ArgumentParser(description="Seed the database set by DATABASE_URL")
+    parser.add_argument("--synthetic", action="store_true", help="Generate a large synthetic dataset instead of the example data")
+    for name, default in SYNTHETIC_COUNTS.items():
+        parser.add_argument(f"--{name}", type=int, default=default)
+    parser.add_argument("--days", type=int, default=730, help="History span the data is spread over")
+    parser.add_argument("--status", type=parse_weights, default=None, help='Task status weights, e.g. "Done=0.6,To Do=0.3,Doing=0.1"')
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent for how tasks and notifications pile onto users (0 = uniform)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    args = parser.parse_args()
+    if args.synthetic:
+        seed_synthetic_data(args.users, args.teams, args.meetings, args.tasks, args.notifications, args.workcycles,
+                            args.days, args.status, args.skew, args.seed, args.batch_size)
+    else:
+        seed_example_data()
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel, create_model
+
+from database import Task
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback keeps the API working without orjson
+    orjson = None
+
+
+def sparse_model(model: type) -> type:
+    # Response schema for a fields= projection: same fields as the full model, but only id is guaranteed present
+    optional = {
+        name: (field.annotation, ...) if name == "id" else (Optional[field.annotation], None)
+        for name, field in model.model_fields.items()
+    }
+    return create_model(f"{model.__name__}Fields", __base__=BaseModel, **optional)
+
+
+def entity_columns(entity, fields: Iterable[str]) -> list:
+    return [entity.__table__.c[name] for name in fields]
+
+
+def task_columns(fields: Iterable[str]) -> list:
+    return entity_columns(Task, fields)
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Tuple[str, ...]:
+    # Sparse fieldset from a comma-separated fields= value, kept in declared order; id is always included
+    if not fields:
+        return tuple(allowed)
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    wanted.add("id")
+    return tuple(name for name in allowed if name in wanted)
+
+
+def rows_to_dicts(rows: Iterable[Sequence], fields: Sequence[str]) -> List[dict]:
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response that serializes plain dicts/lists (datetimes as ISO strings) without pydantic."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def rows_response(rows: Iterable[Sequence], fields: Sequence[str], headers: dict = None) -> FastJSONResponse:
+    return FastJSONResponse(rows_to_dicts(rows, fields), headers=headers)
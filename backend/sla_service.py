@@ -0,0 +1,31 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, Task
+from queries import overdue_verification
+from scheduler import scheduler
+from workflow_service import transition_tasks
+
+SLA_SCAN_INTERVAL_SECONDS = int(os.getenv("SLA_SCAN_INTERVAL_SECONDS", "60"))
+
+
+def scan_sla_breaches(db: Session, now: Optional[datetime] = None) -> int:
+    now = now or datetime.utcnow()
+    # One conditional UPDATE claims the newly overdue tasks, so overlapping scans never notify twice
+    breached = transition_tasks(
+        db,
+        overdue_verification(now) & (Task.sla_breached == False),
+        {"sla_breached": True},
+        lambda t: f"SLA breach: Task verification overdue - {t.description}",
+    )
+    db.commit()
+    return len(breached)
+
+
+@scheduler.every(SLA_SCAN_INTERVAL_SECONDS, "scan_sla_breaches")
+def _scan_sla_breaches_job() -> None:
+    with SessionLocal() as db:
+        scan_sla_breaches(db)
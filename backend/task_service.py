@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict
+
+from sqlalchemy import insert, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, undefer
+
+from audio_service import record_audio
+from database import User, Meeting, Task, normalize_username
+from gemini_service import extract_tasks_from_transcript
+from user_directory import user_directory
+
+DEFAULT_PASSWORD = "changeme"
+
+
+def find_user_by_username(db: Session, username: str) -> Optional[User]:
+    # Both lookups are index seeks; the normalized column replaces an unindexable ILIKE
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        user = db.query(User).filter(User.username_normalized == normalize_username(username)).first()
+    return user
+
+
+def calculate_suggested_focus_time(due_date: Optional[str], effort_tag: Optional[str]) -> Optional[datetime]:
+    if not due_date or not effort_tag:
+        return None
+    
+    effort_hours = {"small": 1, "medium": 3, "large": 6}
+    hours = effort_hours.get(effort_tag, 3)
+    
+    due = datetime.fromisoformat(due_date)
+    suggested = due - timedelta(hours=hours)
+    return suggested
+
+
+def extract_tasks_from_text(db: Session, text: str, meeting_id: int) -> List[Task]:
+    return save_extracted_tasks(db, extract_tasks_from_transcript(text), meeting_id)
+
+
+def resolve_assignees(db: Session, names: List[str]) -> Dict[str, int]:
+    """Map a whole batch of assignee names to user ids, creating users only for names nobody resembles.
+
+    The user directory handles case, punctuation, first-name and near-miss variants in memory; leftovers
+    are inserted in one statement that skips names another worker created meanwhile, then read back.
+    """
+    resolved = user_directory.match_many(db, names)
+    missing = {name: normalize_username(name) for name, user_id in resolved.items() if user_id is None}
+    if missing:
+        rows = {}
+        for name, normalized in missing.items():
+            rows.setdefault(normalized, {
+                "username": " ".join(name.split()), "username_normalized": normalized,
+                "password": DEFAULT_PASSWORD, "is_admin": False,
+            })
+        db.execute(insert_ignoring_conflicts(db, User, ["username_normalized"]), list(rows.values()))
+        found = dict(db.query(User.username_normalized, User.id).filter(User.username_normalized.in_(rows)))
+        for name, normalized in missing.items():
+            resolved[name] = found[normalized]
+    return resolved
+
+
+def insert_ignoring_conflicts(db: Session, model, index_elements: List[str]):
+    # INSERT ... ON CONFLICT DO NOTHING: concurrent writers racing on a unique key both succeed
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def save_extracted_tasks(db: Session, ai_tasks: List[dict], meeting_id: int) -> List[Task]:
+    names = [task_data.get("assignee") or "unassigned" for task_data in ai_tasks]
+    assignees = resolve_assignees(db, names)
+
+    rows = []
+    for task_data, assignee_name in zip(ai_tasks, names):
+        confidence = task_data.get("confidence", 1.0)
+        priority = task_data.get("priority", 5)
+        needs_review = False
+        
+        if confidence < 0.7:
+            priority = 4
+            needs_review = True
+        
+        rows.append(dict(
+            description=task_data.get("description", "Follow up"),
+            due_date=task_data.get("due_date"),
+            status="To Do",
+            meeting_id=meeting_id,
+            assignee_id=assignees[assignee_name],
+            priority=priority,
+            effort_tag=task_data.get("effort_tag"),
+            confidence=confidence,
+            is_approved=False,
+            is_potential_risk=task_data.get("is_potential_risk", False),
+            risk_reason=task_data.get("risk_reason"),
+            needs_priority_review=needs_review,
+            suggested_focus_time=calculate_suggested_focus_time(task_data.get("due_date"), task_data.get("effort_tag"))
+        ))
+    
+    # Batched INSERT ... RETURNING hands back the new rows with ids; one commit covers the meeting
+    tasks = db.scalars(insert(Task).returning(Task), rows).all() if rows else []
+    db.commit()
+    return tasks
+
+
+def save_processed_meeting(db: Session, title: str, meeting_date: str, summary: str, processed_by_id: int, ai_tasks: List[dict],
+                           audio: Optional[dict] = None) -> Meeting:
+    meeting = Meeting(
+        title=title,
+        date=meeting_date,
+        summary_minutes=summary,
+        processed_by_id=processed_by_id
+    )
+    db.add(meeting)
+    db.flush()
+    meeting_id = meeting.id
+    if audio:
+        record_audio(db, audio, meeting_id, processed_by_id)
+    
+    # Meeting, recording reference and tasks land in the same commit
+    save_extracted_tasks(db, ai_tasks, meeting_id)
+    # MeetingOut includes the deferred minutes: one reload with them instead of a refresh plus a lazy load
+    return db.query(Meeting).options(undefer(Meeting.summary_minutes)).filter(Meeting.id == meeting_id).one()
+
+
+def bulk_update_tasks(db: Session, diffs: Dict[int, dict], sprint_order: Optional[List[int]] = None) -> List[int]:
+    """Apply per-task field diffs and an optional sprint ordering in one transaction; returns the ids that exist."""
+    wanted = set(diffs) | set(sprint_order or [])
+    found = {row.id for row in db.query(Task.id).filter(Task.id.in_(wanted))} if wanted else set()
+    now = datetime.utcnow()
+
+    # Tasks receiving the same diff share one UPDATE ... WHERE id IN (...)
+    groups: Dict[tuple, List[int]] = {}
+    for task_id, diff in diffs.items():
+        if task_id not in found or not diff:
+            continue
+        diff = dict(diff)
+        if diff.get("progress") == 100:
+            diff["status"] = "Done"
+        groups.setdefault(tuple(sorted(diff.items())), []).append(task_id)
+    for diff, ids in groups.items():
+        db.query(Task).filter(Task.id.in_(ids)).update({**dict(diff), "last_updated": now}, synchronize_session=False)
+
+    if sprint_order:
+        positions = {task_id: position for position, task_id in enumerate(sprint_order) if task_id in found}
+        if positions:
+            db.query(Task).filter(Task.id.in_(list(positions))).update(
+                {"sprint_position": case(positions, value=Task.id), "last_updated": now}, synchronize_session=False
+            )
+    db.commit()
+    return sorted(found)
@@ -0,0 +1,70 @@
+import os
+import sys
+import itertools
+import tempfile
+
+# The backend uses flat imports and binds its engine on import, so both are set up before any test module loads
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+TEST_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["LLM_CACHE_PATH"] = f"{TEST_DIR}/llm_cache.db"
+os.environ["AUDIO_UPLOAD_DIR"] = f"{TEST_DIR}/uploads"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import SessionLocal, User, Meeting, Task
+
+# Every module shares one database, so fixtures hand out fresh users and never rely on it being empty
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Not entered as a context manager: startup would launch the scheduler and job workers
+    from main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db):
+    def make(is_admin: bool = False) -> User:
+        user = User(username=f"pytest-user-{next(_names)}", password="secret", is_admin=is_admin)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def meeting(db, make_user) -> Meeting:
+    meeting = Meeting(title="Test meeting", date="2024-01-01", processed_by_id=make_user(is_admin=True).id)
+    db.add(meeting)
+    db.commit()
+    return meeting
+
+
+@pytest.fixture
+def make_task(db, meeting):
+    def make(assignee: User, **values) -> Task:
+        task = Task(description=f"Task {next(_names)}", assignee_id=assignee.id, meeting_id=meeting.id, **values)
+        db.add(task)
+        db.commit()
+        return task
+    return make
+
+
+@pytest.fixture
+def login(client):
+    def login(user: User) -> dict:
+        response = client.post("/auth/login", json={"username": user.username, "password": "secret"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+    return login
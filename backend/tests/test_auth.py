@@ -0,0 +1,91 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from auth_service import (
+    RevocationList, create_signed_token, opaque_token_id, purge_expired_tokens, revocations, revoke_token, verify_signed_token,
+)
+from database import engine, RevokedToken, TokenCutoff
+
+
+@pytest.fixture
+def other_process(monkeypatch):
+    # Another worker's cache: it only learns about revocations from the database
+    monkeypatch.setattr(revocations, "poll_seconds", 0)
+    return RevocationList(poll_seconds=0)
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_signed_token_is_accepted_until_logout(client, make_user):
+    token = create_signed_token(make_user())
+
+    assert client.get("/tasks/my", headers=bearer(token)).status_code == 200
+    assert client.post("/auth/logout", headers=bearer(token)).status_code == 200
+    assert client.get("/tasks/my", headers=bearer(token)).status_code == 401
+
+
+def test_logout_is_recorded_for_other_processes(db, make_user, other_process):
+    token = create_signed_token(make_user())
+    claims = verify_signed_token(token)
+
+    revoke_token(db, token)
+
+    assert db.get(RevokedToken, claims.jti) is not None
+    assert other_process.is_revoked(claims.jti, claims.user_id, claims.issued_at)
+
+
+def test_admin_flag_change_cuts_off_earlier_tokens(client, db, make_user, other_process):
+    user = make_user(is_admin=True)
+    before = create_signed_token(user)
+    earlier = verify_signed_token(before)
+    assert client.get("/admin/metrics", headers=bearer(before)).status_code == 200
+
+    user.is_admin = False
+    db.commit()
+    after = create_signed_token(user)
+
+    assert db.get(TokenCutoff, user.id) is not None
+    assert client.get("/admin/metrics", headers=bearer(before)).status_code == 401
+    assert other_process.is_revoked(earlier.jti, earlier.user_id, earlier.issued_at)
+    assert client.get("/admin/metrics", headers=bearer(after)).status_code == 403
+
+
+def test_tampered_or_expired_signed_tokens_are_rejected(make_user):
+    user = make_user()
+    token = create_signed_token(user)
+    payload, signature = token.rsplit(".", 1)
+
+    assert verify_signed_token(f"{payload}.{signature[::-1]}") is None
+    assert verify_signed_token(create_signed_token(user, days_valid=-1)) is None
+
+
+def test_cached_opaque_token_honours_logout_elsewhere(client, make_user, login, other_process):
+    headers = login(make_user())
+    token = headers["Authorization"].split()[1]
+    assert client.get("/tasks/my", headers=headers).status_code == 200
+
+    # What another worker's logout writes, bypassing this process's ORM events and token cache
+    with sqlite3.connect(os.path.abspath(engine.url.database)) as conn:
+        conn.execute("DELETE FROM tokens WHERE token = ?", (token,))
+        conn.execute(
+            "INSERT INTO revoked_tokens (jti, expires_at, revoked_at) VALUES (?, ?, ?)",
+            (opaque_token_id(token), str(datetime.utcnow() + timedelta(days=1)), str(datetime.utcnow())),
+        )
+
+    assert client.get("/tasks/my", headers=headers).status_code == 401
+
+
+def test_purge_drops_expired_revocations(db):
+    db.add(RevokedToken(jti="expired-jti", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.add(RevokedToken(jti="live-jti", expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.commit()
+
+    purge_expired_tokens(db)
+
+    assert db.get(RevokedToken, "expired-jti") is None
+    assert db.get(RevokedToken, "live-jti") is not None
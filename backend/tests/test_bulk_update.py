@@ -0,0 +1,61 @@
+from database import Task
+from main import MAX_BULK_ITEMS
+
+
+def test_bulk_patch_applies_known_ids_and_reports_missing_ones(client, db, make_user, make_task, login):
+    owner = make_user()
+    first, second = make_task(owner), make_task(owner)
+    missing = second.id + 1_000_000
+
+    response = client.patch("/tasks/bulk", headers=login(owner), json={
+        "updates": [
+            {"id": first.id, "priority": 7},
+            {"id": missing, "priority": 1},
+            {"id": second.id, "progress": 100},
+        ],
+        "sprint_order": [second.id, missing, first.id],
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert [(item["id"], item["status"]) for item in body["results"]] == [
+        (first.id, "updated"), (missing, "not_found"), (second.id, "updated"),
+    ]
+    tasks = {item["id"]: item["task"] for item in body["results"]}
+    assert tasks[first.id]["priority"] == 7
+    assert tasks[second.id]["progress"] == 100 and tasks[second.id]["status"] == "Done"
+    assert tasks[missing] is None
+
+    db.expire_all()
+    assert db.get(Task, second.id).sprint_position == 0
+    assert db.get(Task, first.id).sprint_position == 2
+
+
+def test_bulk_patch_merges_repeated_ids_field_by_field(client, db, make_user, make_task, login):
+    owner = make_user()
+    task = make_task(owner)
+
+    response = client.patch("/tasks/bulk", headers=login(owner), json={"updates": [
+        {"id": task.id, "priority": 3, "effort_tag": "small"},
+        {"id": task.id, "priority": 9},
+    ]})
+
+    assert response.status_code == 200
+    assert [(item["id"], item["status"]) for item in response.json()["results"]] == [(task.id, "updated")]
+    db.expire_all()
+    stored = db.get(Task, task.id)
+    assert (stored.priority, stored.effort_tag) == (9, "small")
+
+
+def test_bulk_patch_with_only_missing_ids_changes_nothing(client, make_user, login):
+    response = client.patch("/tasks/bulk", headers=login(make_user()), json={"updates": [{"id": 10**9, "priority": 1}]})
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 0, "results": [{"id": 10**9, "status": "not_found", "task": None}]}
+
+
+def test_bulk_patch_rejects_oversized_batches(client, make_user, login):
+    response = client.patch("/tasks/bulk", headers=login(make_user()), json={"sprint_order": list(range(MAX_BULK_ITEMS + 1))})
+
+    assert response.status_code == 400
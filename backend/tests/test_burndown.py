@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+
+from database import Task, WorkCycle, ProgressSnapshot
+from workcycle_service import capture_progress_snapshots
+
+TODAY = date.today()
+
+
+def day(offset: int) -> str:
+    return (TODAY + timedelta(days=offset)).isoformat()
+
+
+@pytest.fixture
+def cycle(db, make_user):
+    cycle = WorkCycle(name="Sprint", start_date=day(-10), end_date=day(10), owner_id=make_user(is_admin=True).id)
+    db.add(cycle)
+    db.commit()
+    return cycle
+
+
+def snapshots(db, cycle):
+    return db.query(ProgressSnapshot.snapshot_date, ProgressSnapshot.remaining_effort).filter(ProgressSnapshot.workcycle_id == cycle.id).order_by(ProgressSnapshot.snapshot_date).all()
+
+
+def test_snapshot_records_remaining_effort_once_per_day(db, cycle, make_user, make_task):
+    assignee = make_user()
+    make_task(assignee, workcycle_id=cycle.id, effort_tag="large")
+    medium = make_task(assignee, workcycle_id=cycle.id, effort_tag="medium")
+    make_task(assignee, workcycle_id=cycle.id, effort_tag="small", status="Done")
+
+    capture_progress_snapshots(db, day(-1))
+    db.query(Task).filter(Task.id == medium.id).update({Task.status: "Done"})
+    db.commit()
+    capture_progress_snapshots(db, day(0))
+    # A later run on the same day replaces that day's figure instead of adding a row
+    capture_progress_snapshots(db, day(0))
+
+    assert snapshots(db, cycle) == [(day(-1), 8.0), (day(0), 5.0)]
+
+
+def test_snapshot_skips_cycles_outside_their_dates(db, cycle):
+    capture_progress_snapshots(db, day(11))
+
+    assert snapshots(db, cycle) == []
+
+
+def test_burndown_returns_the_requested_range_in_date_order(client, db, cycle, make_user, login):
+    for offset in (2, 0, 1):
+        capture_progress_snapshots(db, day(offset))
+
+    response = client.get(f"/workcycles/{cycle.id}/burndown", params={"start": day(1), "end": day(2)}, headers=login(make_user()))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["workcycle_id"], body["start_date"], body["end_date"]) == (cycle.id, cycle.start_date, cycle.end_date)
+    assert [s["snapshot_date"] for s in body["snapshots"]] == [day(1), day(2)]
+
+
+def test_burndown_of_unknown_cycle_is_404(client, make_user, login):
+    assert client.get("/workcycles/999999999/burndown", headers=login(make_user())).status_code == 404
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import job_queue
+from database import Job
+from job_queue import (
+    JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JobLeaseLost, claim_next_job, enqueue_job, requeue_expired_jobs, run_job, set_job_stage,
+)
+
+
+@pytest.fixture
+def queue(db):
+    # claim_next_job takes the oldest queued job in the whole table, so start each test from an empty queue
+    db.query(Job).filter(Job.status.in_(["queued", "running"])).update({Job.status: "failed"}, synchronize_session=False)
+    db.commit()
+    return db
+
+
+def age_heartbeat(db, job, seconds):
+    db.query(Job).filter(Job.id == job.id).update({Job.heartbeat_at: datetime.utcnow() - timedelta(seconds=seconds)})
+    db.commit()
+
+
+def test_claim_takes_oldest_queued_job_exactly_once(queue):
+    first, second = enqueue_job(queue, "test"), enqueue_job(queue, "test")
+
+    claimed = claim_next_job(queue)
+    assert (claimed.id, claimed.status, claimed.attempts) == (first.id, "running", 1)
+    assert claimed.heartbeat_at is not None
+    assert claim_next_job(queue).id == second.id
+    assert claim_next_job(queue) is None
+
+
+def test_expired_lease_is_requeued_and_live_one_is_left_alone(queue):
+    stale, live = enqueue_job(queue, "test"), enqueue_job(queue, "test")
+    claim_next_job(queue), claim_next_job(queue)
+    age_heartbeat(queue, stale, JOB_LEASE_SECONDS + 1)
+
+    assert requeue_expired_jobs(queue) == 1
+
+    queue.expire_all()
+    assert (queue.get(Job, stale.id).status, queue.get(Job, stale.id).stage) == ("queued", "requeued")
+    assert queue.get(Job, live.id).status == "running"
+    reclaimed = claim_next_job(queue)
+    assert (reclaimed.id, reclaimed.attempts) == (stale.id, 2)
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(queue):
+    job = enqueue_job(queue, "test")
+    claim_next_job(queue)
+    queue.query(Job).filter(Job.id == job.id).update({Job.attempts: JOB_MAX_ATTEMPTS})
+    age_heartbeat(queue, job, JOB_LEASE_SECONDS + 1)
+
+    requeue_expired_jobs(queue)
+
+    queue.expire_all()
+    stored = queue.get(Job, job.id)
+    assert (stored.status, stored.error) == ("failed", "Worker stopped responding")
+    assert stored.finished_at is not None
+
+
+def test_reclaimed_job_stops_its_old_worker(queue):
+    enqueue_job(queue, "test")
+    old = claim_next_job(queue)
+    age_heartbeat(queue, old, JOB_LEASE_SECONDS + 1)
+    requeue_expired_jobs(queue)
+    claim_next_job(queue)
+
+    with pytest.raises(JobLeaseLost):
+        set_job_stage(queue, old, "analyzing", 10)
+
+
+def test_failed_handler_is_retried_then_marked_failed(queue, monkeypatch):
+    def fail(db, job):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "test", fail)
+    job = enqueue_job(queue, "test")
+
+    for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+        claimed = claim_next_job(queue)
+        assert (claimed.id, claimed.attempts) == (job.id, attempt)
+        run_job(queue, claimed)
+
+    queue.expire_all()
+    stored = queue.get(Job, job.id)
+    assert (stored.status, stored.error) == ("failed", "boom")
+    assert claim_next_job(queue) is None
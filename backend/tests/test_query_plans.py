@@ -0,0 +1,29 @@
+import pytest
+
+from database import SessionLocal
+from query_plans import check_query_plans
+from seed_data import seed_synthetic_data
+
+
+@pytest.fixture(scope="module")
+def db():
+    # Enough rows, and fresh statistics, for the planner to choose as it would in production
+    seed_synthetic_data(users=500, teams=5, meetings=1000, tasks=20000, notifications=5000, workcycles=10)
+    with SessionLocal() as session:
+        yield session
+
+
+def test_hot_queries_use_an_index(db):
+    failures = {name: result["failures"] for name, result in check_query_plans(db).items() if result["failures"]}
+    assert not failures
+
+
+def test_hot_queue_queries_use_partial_indexes(db):
+    results = check_query_plans(db)
+    for name, index in [
+        ("GET /tasks/queue", "ix_tasks_queue_unplanned"),
+        ("GET /tasks/review", "ix_tasks_review_unapproved"),
+        ("GET /tasks/sla-breached", "ix_tasks_awaiting_verification"),
+        ("plan tomorrow (user)", "ix_tasks_open_assignee"),
+    ]:
+        assert any(index in step for step in results[name]["plan"]), (name, results[name]["plan"])
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from data_versions import data_versions
+from database import engine
+
+
+@pytest.fixture
+def assignee_tasks(make_user, make_task):
+    # Several tasks share a created_at so pages must break the tie on id
+    assignee = make_user()
+    same_time = datetime(2024, 5, 1, 12, 0, 0)
+    tasks = [make_task(assignee, created_at=same_time) for _ in range(4)]
+    tasks.append(make_task(assignee, created_at=datetime(2024, 5, 2)))
+    return assignee, tasks
+
+
+def test_cursor_pages_walk_every_task_once_in_order(client, make_user, login, assignee_tasks):
+    assignee, tasks = assignee_tasks
+    headers = login(make_user(is_admin=True))
+    params = {"assignee_id": assignee.id, "limit": 2, "fields": "id"}
+
+    seen, pages = [], 0
+    while True:
+        response = client.get("/tasks", params=params, headers=headers)
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    newest, *tied = tasks[::-1]
+    assert seen == [newest.id] + sorted((t.id for t in tied), reverse=True)
+    assert pages == 3
+
+
+def test_list_without_limit_returns_everything_and_no_cursor(client, make_user, login, assignee_tasks):
+    assignee, tasks = assignee_tasks
+    response = client.get("/tasks", params={"assignee_id": assignee.id}, headers=login(make_user(is_admin=True)))
+
+    assert len(response.json()) == len(tasks)
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_malformed_cursor_is_400(client, make_user, login):
+    response = client.get("/tasks", params={"limit": 2, "cursor": "not-a-cursor"}, headers=login(make_user(is_admin=True)))
+
+    assert response.status_code == 400
+
+
+def test_unchanged_list_revalidates_with_304(client, make_user, make_task, login):
+    owner = make_user()
+    make_task(owner)
+    headers = login(owner)
+
+    first = client.get("/tasks/my", headers=headers)
+    etag = first.headers["ETag"]
+    again = client.get("/tasks/my", headers={**headers, "If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_write_through_the_api_changes_the_etag(client, make_user, make_task, login):
+    owner = make_user()
+    task = make_task(owner)
+    headers = login(owner)
+    etag = client.get("/tasks/my", headers=headers).headers["ETag"]
+
+    assert client.patch(f"/tasks/{task.id}", json={"priority": 4}, headers=headers).status_code == 200
+    response = client.get("/tasks/my", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["priority"] == 4
+
+
+def test_write_from_another_process_changes_the_etag(client, make_user, make_task, login, monkeypatch):
+    owner = make_user()
+    task = make_task(owner)
+    headers = login(owner)
+    etag = client.get("/tasks/my", headers=headers).headers["ETag"]
+
+    # A separate connection is invisible to this process's engine hooks; only the database triggers see it
+    with sqlite3.connect(os.path.abspath(engine.url.database)) as conn:
+        conn.execute("UPDATE tasks SET priority = 6 WHERE id = ?", (task.id,))
+    monkeypatch.setattr(data_versions, "poll_seconds", 0)
+    response = client.get("/tasks/my", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()[0]["priority"] == 6
+
+
+def test_etag_is_not_shared_between_users(client, make_user, make_task, login):
+    first, second = make_user(), make_user()
+    make_task(first), make_task(second)
+    etag = client.get("/tasks/my", headers=login(first)).headers["ETag"]
+
+    response = client.get("/tasks/my", headers={**login(second), "If-None-Match": etag})
+
+    assert response.status_code == 200
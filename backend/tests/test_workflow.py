@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import Task, Notification
+from notification_hub import notification_hub
+from sla_service import scan_sla_breaches
+from workflow_service import PLANNED_STATUS, approve_by_manager, plan_tomorrow_for_user, record_verification, submit_for_review
+
+
+@pytest.fixture
+def published(monkeypatch):
+    # What the hub would push to open streams, captured once the writing transaction commits
+    payloads = []
+    monkeypatch.setattr(notification_hub, "publish", payloads.extend)
+    return payloads
+
+
+def notifications_for(db, user):
+    return db.query(Notification.message, Notification.task_id).filter(Notification.user_id == user.id).order_by(Notification.id).all()
+
+
+def test_submit_and_verify_notify_the_assignee(db, make_user, make_task, published):
+    assignee, reviewer = make_user(), make_user(is_admin=True)
+    task = make_task(assignee, status="Doing")
+
+    assert submit_for_review(db, task.id, assignee.id, "done", None)
+    assert record_verification(db, task.id, reviewer.id, False, "needs tests")
+
+    db.expire_all()
+    stored = db.get(Task, task.id)
+    assert (stored.status, stored.progress, stored.submitted_at) == ("Doing", 50, None)
+    assert [message for message, _ in notifications_for(db, assignee)] == [
+        f"Task submitted for review: {task.description}",
+        f"Task rejected: {task.description}. Feedback: needs tests",
+    ]
+    assert [(p["user_id"], p["task_id"]) for p in published] == [(assignee.id, task.id)] * 2
+
+
+def test_submit_by_someone_else_matches_nothing(db, make_user, make_task, published):
+    assignee, stranger = make_user(), make_user()
+    task = make_task(assignee, status="Doing")
+
+    assert not submit_for_review(db, task.id, stranger.id, "done", None)
+
+    db.expire_all()
+    assert db.get(Task, task.id).status == "Doing"
+    assert notifications_for(db, assignee) == []
+    assert published == []
+
+
+def test_manager_approval_moves_only_pending_tasks(db, make_user, make_task, published):
+    assignee = make_user()
+    pending = [make_task(assignee, status="Manager Approval Pending") for _ in range(3)]
+    elsewhere = make_task(assignee, status="Doing")
+
+    approved = approve_by_manager(db, [t.id for t in pending] + [elsewhere.id])
+
+    assert sorted(approved) == sorted(t.id for t in pending)
+    db.expire_all()
+    assert {db.get(Task, t.id).status for t in pending} == {"To Do"}
+    assert db.get(Task, elsewhere.id).status == "Doing"
+    assert sorted(task_id for _, task_id in notifications_for(db, assignee)) == sorted(approved)
+    assert len(published) == 3
+
+
+def test_sla_scan_flags_and_notifies_each_breach_once(db, make_user, make_task, published):
+    assignee = make_user()
+    overdue = make_task(assignee, status="Submitted", submitted_at=datetime.utcnow() - timedelta(days=2),
+                        verification_deadline_at=datetime.utcnow() - timedelta(days=1))
+    on_time = make_task(assignee, status="Submitted", submitted_at=datetime.utcnow(),
+                        verification_deadline_at=datetime.utcnow() + timedelta(days=1))
+
+    scan_sla_breaches(db)
+    scan_sla_breaches(db)
+
+    db.expire_all()
+    assert db.get(Task, overdue.id).sla_breached
+    assert not db.get(Task, on_time.id).sla_breached
+    assert [task_id for _, task_id in notifications_for(db, assignee)] == [overdue.id]
+    assert [p["task_id"] for p in published if p["user_id"] == assignee.id] == [overdue.id]
+
+
+def test_plan_tomorrow_moves_open_unfinished_tasks_without_notifying(db, make_user, make_task, published):
+    assignee = make_user()
+    open_task = make_task(assignee, status="To Do")
+    finished = make_task(assignee, status="Done", progress=100)
+    later = (datetime.utcnow() + timedelta(days=30)).date().isoformat()
+    keeps_due_date = make_task(assignee, status="Doing", due_date=later)
+
+    assert plan_tomorrow_for_user(db, assignee.id) == 2
+
+    db.expire_all()
+    tomorrow = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
+    assert (db.get(Task, open_task.id).status, db.get(Task, open_task.id).due_date) == (PLANNED_STATUS, tomorrow)
+    assert db.get(Task, keeps_due_date.id).due_date == later
+    assert db.get(Task, finished.id).status == "Done"
+    assert notifications_for(db, assignee) == []
+    assert published == []
@@ -0,0 +1,114 @@
+import os
+import re
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from database import User, normalize_username
+from data_versions import data_versions
+
+# Minimum SequenceMatcher ratio for a fuzzy match, and how far ahead of the runner-up it must be
+ASSIGNEE_FUZZY_THRESHOLD = float(os.getenv("ASSIGNEE_FUZZY_THRESHOLD", "0.85"))
+ASSIGNEE_FUZZY_MARGIN = 0.05
+
+
+def name_key(name: str) -> str:
+    # Punctuation-free form for alias and fuzzy matching: "Priya S." -> "priya s"
+    return " ".join(re.findall(r"\w+", normalize_username(name)))
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class UserDirectory:
+    """In-memory index of usernames for resolving the free-form assignee names the LLM produces.
+
+    Resolution order: normalized username, punctuation-free key, first name when exactly one user has it and
+    every further word is a prefix of that user's next name ("Arjun K" -> "Arjun Kumar", but not
+    "Alex from the vendor" -> "Alex Smith"), then the closest trigram candidate by edit similarity.
+    Rebuilt lazily whenever the users table has been written since the last load.
+    """
+
+    def __init__(self, threshold: float = ASSIGNEE_FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self._version = -1
+        self._exact: Dict[str, int] = {}
+        self._keys: Dict[str, int] = {}
+        self._first_names: Dict[str, Set[int]] = {}
+        self._key_by_id: Dict[int, str] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session) -> None:
+        version = data_versions.version("users")
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            exact, keys, key_by_id, first_names, grams = {}, {}, {}, defaultdict(set), defaultdict(set)
+            for user_id, normalized in db.query(User.id, User.username_normalized).filter(User.username_normalized != None):
+                exact[normalized] = user_id
+                key = name_key(normalized)
+                if not key:
+                    continue
+                keys.setdefault(key, user_id)
+                key_by_id[user_id] = key
+                first_names[key.split()[0]].add(user_id)
+                for gram in trigrams(key):
+                    grams[gram].add(key)
+            self._exact, self._keys, self._key_by_id = exact, keys, key_by_id
+            self._first_names, self._trigrams = dict(first_names), dict(grams)
+            self._version = version
+
+    def match(self, db: Session, name: str) -> Optional[int]:
+        self.refresh(db)
+        return self._match(name)
+
+    def match_many(self, db: Session, names: Iterable[str]) -> Dict[str, Optional[int]]:
+        self.refresh(db)
+        return {name: self._match(name) for name in set(names)}
+
+    def _match(self, name: str) -> Optional[int]:
+        normalized = normalize_username(name)
+        if normalized in self._exact:
+            return self._exact[normalized]
+        key = name_key(name)
+        if not key:
+            return None
+        if key in self._keys:
+            return self._keys[key]
+        first, *rest = key.split()
+        candidates = self._first_names.get(first, ())
+        if len(candidates) == 1:
+            user_id = next(iter(candidates))
+            # Extra words must confirm the match (a surname or its initial), never just be dropped
+            theirs = self._key_by_id[user_id].split()[1:]
+            if len(rest) <= len(theirs) and all(t.startswith(r) for r, t in zip(rest, theirs)):
+                return user_id
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Optional[int]:
+        # Only names sharing a trigram are scored, so this stays cheap as the user table grows
+        candidates = set()
+        for gram in trigrams(key):
+            candidates |= self._trigrams.get(gram, set())
+        scored = sorted(((SequenceMatcher(None, key, c).ratio(), c) for c in candidates), reverse=True)
+        if not scored or scored[0][0] < self.threshold:
+            return None
+        # Ambiguous: two users are about as close as each other
+        if len(scored) > 1 and scored[0][0] - scored[1][0] < ASSIGNEE_FUZZY_MARGIN:
+            return None
+        return self._keys[scored[0][1]]
+
+    def stats(self) -> Dict:
+        return {"users": len(self._exact), "trigrams": len(self._trigrams), "version": self._version}
+
+
+user_directory = UserDirectory()
+
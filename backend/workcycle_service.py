@@ -0,0 +1,86 @@
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func, case, or_, select, insert, delete, literal
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, Task, WorkCycle, ProgressSnapshot
+from scheduler import scheduler
+from queries import burndown_query
+
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "3600"))
+EFFORT_POINTS = {"small": 1, "medium": 3, "large": 5}
+SNAPSHOT_SAMPLE_SIZE = 3
+
+
+def effort_points():
+    return case(*((Task.effort_tag == tag, points) for tag, points in EFFORT_POINTS.items()), else_=0)
+
+
+def capture_progress_snapshots(db: Session, day: Optional[str] = None) -> int:
+    # One row per active cycle per day; later runs on the same day overwrite it with the latest figure
+    day = day or datetime.utcnow().date().isoformat()
+    active = select(WorkCycle.id).where(WorkCycle.start_date <= day, WorkCycle.end_date >= day)
+    remaining = (
+        select(
+            WorkCycle.id,
+            literal(day),
+            func.coalesce(func.sum(case((Task.status != "Done", effort_points()), else_=0)), 0),
+            literal(datetime.utcnow()),
+        )
+        .select_from(WorkCycle)
+        .outerjoin(Task, Task.workcycle_id == WorkCycle.id)
+        .where(WorkCycle.start_date <= day, WorkCycle.end_date >= day)
+        .group_by(WorkCycle.id)
+    )
+    db.execute(delete(ProgressSnapshot).where(ProgressSnapshot.snapshot_date == day, ProgressSnapshot.workcycle_id.in_(active)))
+    result = db.execute(insert(ProgressSnapshot).from_select(
+        ["workcycle_id", "snapshot_date", "remaining_effort", "created_at"], remaining
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def get_burndown(db: Session, cycle: WorkCycle, start: Optional[str] = None, end: Optional[str] = None) -> Dict:
+    return {
+        "workcycle_id": cycle.id,
+        "cycle_name": cycle.name,
+        "start_date": cycle.start_date,
+        "end_date": cycle.end_date,
+        "snapshots": burndown_query(db.query(ProgressSnapshot), cycle.id, start, end).all(),
+    }
+
+
+def get_workcycle_snapshot(db: Session, cycle: WorkCycle) -> Dict:
+    totals = db.query(
+        func.count(Task.id),
+        func.coalesce(func.sum(case((Task.status == "Done", 1), else_=0)), 0),
+        func.coalesce(func.sum(effort_points()), 0),
+        func.coalesce(func.sum(case((Task.status != "Done", effort_points()), else_=0)), 0),
+    ).filter(Task.workcycle_id == cycle.id).one()
+
+    def sample(*conditions):
+        return db.query(Task.id, Task.description, Task.due_date).filter(Task.workcycle_id == cycle.id, *conditions).order_by(Task.id).limit(SNAPSHOT_SAMPLE_SIZE).all()
+
+    description = func.lower(Task.description)
+    blockers = sample(or_(description.contains("block"), description.contains("stuck")))
+    doing = sample(Task.status == "Doing")
+    upcoming = sample(Task.due_date != None, Task.status.notin_(["Done", "Doing"]))
+
+    return {
+        "cycle_name": cycle.name,
+        "total_items": totals[0],
+        "completed_items": totals[1],
+        "total_effort": totals[2],
+        "remaining_effort": totals[3],
+        "blockers": [{"id": t.id, "description": t.description} for t in blockers],
+        "doing": [{"id": t.id, "description": t.description} for t in doing],
+        "upcoming": [{"id": t.id, "due_date": t.due_date} for t in upcoming],
+    }
+
+
+@scheduler.every(SNAPSHOT_INTERVAL_SECONDS, "capture_progress_snapshots")
+def _capture_progress_snapshots_job() -> None:
+    with SessionLocal() as db:
+        capture_progress_snapshots(db)
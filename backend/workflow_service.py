@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import update, insert, select, case, or_, true
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from database import Task, TeamMember, Notification, OPEN_STATUSES
+from notification_hub import notification_hub
+from queries import status_in
+
+PLANNED_STATUS = "Planned for Tomorrow"
+
+
+def notify_assignees(db: Session, tasks: List[Row], message: Callable[[Row], str]) -> None:
+    # One INSERT for the whole batch; published to open streams when the caller commits
+    rows = [{"user_id": t.assignee_id, "message": message(t), "task_id": t.id} for t in tasks]
+    notifications = db.scalars(insert(Notification).returning(Notification), rows).all()
+    notification_hub.publish_on_commit(db, notifications)
+
+
+def transition_tasks(db: Session, condition, values: dict, message: Optional[Callable[[Row], str]] = None) -> List[Row]:
+    """Move every task matching condition to values in one UPDATE and notify their assignees; the caller commits.
+
+    The condition doubles as the precondition check, so a task that changed state concurrently is simply not matched.
+    """
+    tasks = db.execute(
+        update(Task)
+        .where(condition)
+        .values(**values, last_updated=datetime.utcnow())
+        .returning(Task.id, Task.assignee_id, Task.description)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if tasks and message:
+        notify_assignees(db, tasks, message)
+    return tasks
+
+
+def _plan_tomorrow(db: Session, condition) -> int:
+    tomorrow = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
+    tasks = transition_tasks(
+        db,
+        status_in(*OPEN_STATUSES) & (Task.progress < 100) & condition,
+        {
+            "status": PLANNED_STATUS,
+            "due_date": case((or_(Task.due_date == None, Task.due_date < tomorrow), tomorrow), else_=Task.due_date),
+        },
+    )
+    db.commit()
+    return len(tasks)
+
+
+def plan_tomorrow_for_user(db: Session, user_id: int) -> int:
+    return _plan_tomorrow(db, Task.assignee_id == user_id)
+
+
+def plan_tomorrow_for_team(db: Session, team_id: Optional[int] = None) -> int:
+    # No team means everyone
+    if team_id is None:
+        return _plan_tomorrow(db, true())
+    members = select(TeamMember.user_id).where(TeamMember.team_id == team_id)
+    return _plan_tomorrow(db, Task.assignee_id.in_(members))
+
+
+def submit_for_review(db: Session, task_id: int, user_id: int, notes: str, url: Optional[str]) -> bool:
+    now = datetime.utcnow()
+    tasks = transition_tasks(
+        db,
+        (Task.id == task_id) & (Task.assignee_id == user_id),
+        {
+            "submitted_at": now,
+            "submission_notes": notes,
+            "submission_url": url,
+            "status": "Submitted",
+            "progress": 100,
+            "verification_deadline_at": now + timedelta(hours=24),
+        },
+        lambda t: f"Task submitted for review: {t.description}",
+    )
+    db.commit()
+    return bool(tasks)
+
+
+def record_verification(db: Session, task_id: int, verifier_id: int, approved: bool, notes: Optional[str]) -> bool:
+    values = {"verified_at": datetime.utcnow(), "verified_by_id": verifier_id, "verification_notes": notes}
+    if approved:
+        values["status"] = "Done"
+        message = lambda t: f"Task approved: {t.description}"
+    else:
+        values.update(status="Doing", submitted_at=None, progress=50)
+        message = lambda t: f"Task rejected: {t.description}. Feedback: {notes}"
+    tasks = transition_tasks(db, (Task.id == task_id) & (Task.submitted_at != None), values, message)
+    db.commit()
+    return bool(tasks)
+
+
+def approve_by_manager(db: Session, task_ids: List[int]) -> List[int]:
+    tasks = transition_tasks(
+        db,
+        Task.id.in_(task_ids) & (Task.status == "Manager Approval Pending"),
+        {"status": "To Do", "is_approved": True},
+        lambda t: f"Task approved by manager: {t.description}",
+    )
+    db.commit()
+    return [t.id for t in tasks]
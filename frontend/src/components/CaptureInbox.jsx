@@ -8,8 +8,8 @@ export default function CaptureInbox({ token }) {
   async function load() {
     setLoading(true);
     try {
-      const data = await api.tasks.list(token);
-      setTasks(data.filter(t => t.status === "Capture Inbox"));
+      const data = await api.tasks.list(token, { status: "Capture Inbox" });
+      setTasks(data);
     } catch (e) {
       setTasks([]);
     } finally {
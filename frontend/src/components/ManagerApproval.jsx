@@ -8,8 +8,8 @@ export default function ManagerApproval({ token }) {
   async function load() {
     setLoading(true);
     try {
-      const data = await api.tasks.list(token);
-      setTasks(data.filter(t => t.status === "Manager Approval Pending"));
+      const data = await api.tasks.list(token, { status: "Manager Approval Pending" });
+      setTasks(data);
     } catch (e) {
       setTasks([]);
     } finally {
@@ -5,28 +5,67 @@ export default function NotificationPanel({ token }) {
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(true);
 
-  async function load() {
-    setLoading(true);
+  async function load(showSpinner = true) {
+    if (showSpinner) setLoading(true);
     try {
       const data = await api.notifications.list(token);
       setNotifications(data);
+      return data;
     } catch (e) {
       setNotifications([]);
+      return [];
     } finally {
       setLoading(false);
     }
   }
 
   useEffect(() => {
-    load();
-    const interval = setInterval(load, 30000);
-    return () => clearInterval(interval);
+    // Load once, then let the server push new notifications instead of polling
+    let source;
+    let retry;
+    let lastId = 0;
+    let cancelled = false;
+
+    async function connect() {
+      let ticket;
+      try {
+        ({ ticket } = await api.notifications.streamTicket(token));
+      } catch (e) {
+        retry = setTimeout(connect, 5000);
+        return;
+      }
+      if (cancelled) return;
+      source = new EventSource(api.notifications.streamUrl(ticket, lastId));
+      source.addEventListener("notification", (e) => {
+        const n = JSON.parse(e.data);
+        lastId = Math.max(lastId, n.id);
+        setNotifications(prev => (prev.some(p => p.id === n.id) ? prev : [n, ...prev]));
+      });
+      // Sent when the server dropped events for this stream; EventSource reconnects by itself
+      source.addEventListener("resync", () => load(false));
+      // Tickets are single-use, so a reconnect with the old URL is refused; fetch a fresh ticket instead
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED || cancelled) return;
+        retry = setTimeout(connect, 1000);
+      };
+    }
+
+    load().then((data) => {
+      if (cancelled) return;
+      lastId = data.reduce((max, n) => Math.max(max, n.id), 0);
+      connect();
+    });
+    return () => {
+      cancelled = true;
+      clearTimeout(retry);
+      if (source) source.close();
+    };
   }, [token]);
 
   async function markRead(id) {
     try {
       await api.notifications.markRead(token, id);
-      load();
+      load(false);
     } catch (e) {
       console.error(e);
     }
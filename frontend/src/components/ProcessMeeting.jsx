@@ -17,9 +17,19 @@ export default function ProcessMeeting({ token }) {
       if (date) fd.append("date", date);
       if (transcript) fd.append("transcript", transcript);
       if (file) fd.append("file", file);
+      fd.append("background", "true");
 
-      const mt = await api.meetings.process(token, fd);
-      setStatus("Processed: " + mt.title);
+      const queued = await api.meetings.process(token, fd);
+      if (queued.job_id) {
+        let job = await api.jobs.get(token, queued.job_id);
+        while (job.status === "queued" || job.status === "running") {
+          setStatus(`Processing... ${job.progress}% (${job.stage})`);
+          await new Promise((r) => setTimeout(r, 1500));
+          job = await api.jobs.get(token, queued.job_id);
+        }
+        if (job.status === "failed") throw new Error("Processing failed: " + job.error);
+      }
+      setStatus("Processed: " + title);
       setTitle("");
       setTranscript("");
       setFile(null);
@@ -33,6 +33,15 @@ export default function ReviewQueue({ token }) {
     }
   }
 
+  async function approveAll() {
+    try {
+      await api.tasks.bulkUpdate(token, tasks.map((t) => ({ id: t.id, is_approved: true })));
+      window.dispatchEvent(new Event("ma_refresh"));
+    } catch (e) {
+      alert("Failed: " + e.message);
+    }
+  }
+
   async function updatePriority(id, priority) {
     try {
       await api.tasks.update(token, id, { priority: Number(priority) });
@@ -53,7 +62,12 @@ export default function ReviewQueue({ token }) {
 
   return (
     <div className="card">
-      <h3>Review Queue (Unapproved Tasks)</h3>
+      <div className="row">
+        <h3>Review Queue (Unapproved Tasks)</h3>
+        {tasks.length > 1 && (
+          <button className="btn small" onClick={approveAll}>Approve All ({tasks.length})</button>
+        )}
+      </div>
       {loading ? (
         <div className="muted">Loading...</div>
       ) : (
@@ -1,4 +1,5 @@
 import { useState, useEffect } from "react";
+import { api } from "../utils/api";
 
 export function useAuth() {
   const [token, setToken] = useState(() => localStorage.getItem("ma_token") || "");
@@ -20,6 +21,7 @@ export function useAuth() {
   }, [isAdmin]);
 
   const logout = () => {
+    if (token) api.auth.logout(token).catch(() => {});
     setToken("");
     setUsername("");
     setIsAdmin(false);
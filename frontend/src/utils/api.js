@@ -1,13 +1,34 @@
 export const API_BASE = "http://127.0.0.1:8000";
 
+// Last body and ETag per GET (keyed by token and URL), so unchanged lists come back as an empty 304
+const etagCache = new Map();
+const ETAG_CACHE_SIZE = 100;
+
 export const api = {
   async request(endpoint, options = {}) {
+    const method = (options.method || "GET").toUpperCase();
+    const key = method === "GET" ? `${options.headers?.Authorization || ""} ${endpoint}` : null;
+    const cached = key && etagCache.get(key);
+    if (cached) {
+      options = { ...options, headers: { ...options.headers, "If-None-Match": cached.etag } };
+    }
+
     const res = await fetch(`${API_BASE}${endpoint}`, options);
+    if (res.status === 304 && cached) {
+      return cached.data;
+    }
     if (!res.ok) {
       const body = await res.json().catch(() => ({}));
       throw new Error(body.detail || "Request failed");
     }
-    return res.json();
+    const data = await res.json();
+    const etag = res.headers.get("ETag");
+    if (key && etag) {
+      etagCache.delete(key);
+      etagCache.set(key, { etag, data });
+      if (etagCache.size > ETAG_CACHE_SIZE) etagCache.delete(etagCache.keys().next().value);
+    }
+    return data;
   },
 
   analytics: {
@@ -28,6 +49,11 @@ export const api = {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ username, password }),
       }),
+    logout: (token) =>
+      api.request("/auth/logout", {
+        method: "POST",
+        headers: { Authorization: `Bearer ${token}` },
+      }),
   },
 
   meetings: {
@@ -43,6 +69,21 @@ export const api = {
       }),
   },
 
+  jobs: {
+    get: (token, id) =>
+      api.request(`/jobs/${id}`, {
+        headers: { Authorization: `Bearer ${token}` },
+      }),
+  },
+
+  search: (token, q, { kind, limit = 20, offset = 0 } = {}) => {
+    const params = new URLSearchParams({ q, limit, offset });
+    if (kind) params.set("kind", kind);
+    return api.request(`/search?${params}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+  },
+
   tasks: {
     approveManager: (token, id) =>
       api.request(`/tasks/${id}/approve-manager`, {
@@ -76,10 +117,14 @@ export const api = {
       api.request("/tasks/pending-verification", {
         headers: { Authorization: `Bearer ${token}` },
       }),
-    list: (token) =>
-      api.request("/tasks", {
+    list: (token, filters = {}) => {
+      const params = new URLSearchParams(
+        Object.entries(filters).filter(([, v]) => v !== undefined && v !== null)
+      ).toString();
+      return api.request(params ? `/tasks?${params}` : "/tasks", {
         headers: { Authorization: `Bearer ${token}` },
-      }),
+      });
+    },
     my: (token) =>
       api.request("/tasks/my", {
         headers: { Authorization: `Bearer ${token}` },
@@ -101,6 +146,13 @@ export const api = {
         headers: { "Content-Type": "application/json", Authorization: `Bearer ${token}` },
         body: JSON.stringify(data),
       }),
+    // updates: [{ id, ...fields }]; sprintOrder: task ids in board order
+    bulkUpdate: (token, updates, sprintOrder = null) =>
+      api.request("/tasks/bulk", {
+        method: "PATCH",
+        headers: { "Content-Type": "application/json", Authorization: `Bearer ${token}` },
+        body: JSON.stringify({ updates, sprint_order: sprintOrder }),
+      }),
     queue: (token) =>
       api.request("/tasks/queue", {
         headers: { Authorization: `Bearer ${token}` },
@@ -130,6 +182,10 @@ export const api = {
       api.request(`/workcycles/${id}/snapshot`, {
         headers: { Authorization: `Bearer ${token}` },
       }),
+    burndown: (token, id) =>
+      api.request(`/workcycles/${id}/burndown`, {
+        headers: { Authorization: `Bearer ${token}` },
+      }),
   },
 
   notifications: {
@@ -142,6 +198,14 @@ export const api = {
         method: "PATCH",
         headers: { Authorization: `Bearer ${token}` },
       }),
+    // EventSource cannot send headers; a single-use ticket goes in the URL instead of the session token
+    streamTicket: (token) =>
+      api.request("/notifications/stream-ticket", {
+        method: "POST",
+        headers: { Authorization: `Bearer ${token}` },
+      }),
+    streamUrl: (ticket, lastId = 0) =>
+      `${API_BASE}/notifications/stream?${new URLSearchParams({ ticket, last_id: lastId })}`,
   },
 
   bundles: {